@@ -0,0 +1 @@
+"""Offline benchmarks and soak tests of the integration against a local stand-in."""
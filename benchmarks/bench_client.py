@@ -0,0 +1,112 @@
+"""Compare the integration's tuned session with untuned client settings.
+
+    python -m benchmarks.bench_client --stations 20 --polls 10 --json
+
+Every configuration polls the same stations with api.fetch_weather_data
+against a stand-in subprocess:
+
+    tuned          create_session(): keep-alive pool, DNS cache, compression
+    no-compression the same without Accept-Encoding, bodies come uncompressed
+    no-keepalive   a new connection per request, like a closing pool
+    untuned        neither
+
+Reported per configuration: poll latency percentiles, CPU per poll and the
+body bytes the stand-in sent per poll (and would have sent uncompressed). The
+first round, which scrapes the API key, isn't measured.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from custom_components.wunderground_weather.api import ApiKeyCache, fetch_weather_data
+from custom_components.wunderground_weather.client import create_session
+from custom_components.wunderground_weather.stats import StationStats
+
+from .bench_poll import station_ids
+from .metrics import percentile
+from .standin import fetch_stats, redirect, standin_process
+
+
+def _session(keepalive, compression):
+    """Return a session with the given client settings."""
+    if keepalive and compression:
+        return create_session()
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(force_close=not keepalive),
+        skip_auto_headers=() if compression else ("Accept-Encoding",),
+    )
+
+
+CONFIGURATIONS = {
+    "tuned": (True, True),
+    "no-compression": (True, False),
+    "no-keepalive": (False, True),
+    "untuned": (False, False),
+}
+
+
+async def async_run(name, url, stations, polls):
+    """Poll stations rounds of polls with one configuration."""
+    key_cache = ApiKeyCache()
+    latencies = []
+
+    async def poll(session, station_id, record):
+        start = time.perf_counter()
+        await fetch_weather_data(session, station_id, key_cache, StationStats())
+        if record:
+            latencies.append(time.perf_counter() - start)
+
+    async with aiohttp.ClientSession() as stats_session:
+        async with _session(*CONFIGURATIONS[name]) as session:
+            await asyncio.gather(*(poll(session, station, False) for station in stations))
+            before = await fetch_stats(stats_session, url)
+            cpu_start = time.process_time()
+            for _ in range(polls):
+                await asyncio.gather(*(poll(session, station, True) for station in stations))
+            cpu = time.process_time() - cpu_start
+        after = await fetch_stats(stats_session, url)
+
+    total = len(stations) * polls
+    return {
+        "configuration": name,
+        "latency_p50_ms": round(1000 * percentile(latencies, 0.50), 3),
+        "latency_p95_ms": round(1000 * percentile(latencies, 0.95), 3),
+        "cpu_per_poll_ms": round(1000 * cpu / total, 3),
+        "bytes_per_poll": (after["bytes_sent"] - before["bytes_sent"]) // total,
+        "uncompressed_bytes_per_poll": (
+            after["bytes_uncompressed"] - before["bytes_uncompressed"]
+        ) // total,
+    }
+
+
+async def async_main(args):
+    """Run every configuration against one stand-in."""
+    stations = station_ids(args.stations)
+    with standin_process(latency=args.latency) as url, redirect(url):
+        return [
+            await async_run(name, url, stations, args.polls) for name in CONFIGURATIONS
+        ]
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=20)
+    parser.add_argument("--polls", type=int, default=10, help="rounds of polls per station")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
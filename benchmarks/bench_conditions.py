@@ -0,0 +1,167 @@
+"""Compare batch condition classification with the scalar function on many rows.
+
+    python -m benchmarks.bench_conditions --rows 1000000
+
+reference_condition is the scalar map_condition the batch classifier
+replaced, without its log calls, so the timings compare like with like.
+Every row is classified both ways and any difference fails the run. The
+parity tests keep their own verbatim copy of the scalar rules.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from custom_components.wunderground_weather.conditions import CONDITIONS, classify_conditions
+
+
+def reference_condition(data):
+    """Map observation payload data to a condition, one row at a time."""
+    metric = data.get("metric", {})
+    temp = metric.get("temp", 0)
+    humidity = data.get("humidity", 0)
+    wind_speed = metric.get("windSpeed", 0)
+    precip_rate = metric.get("precipRate", 0)
+    solar_radiation = data.get("solarRadiation", 0)
+    uv_index = data.get("uv", 0)
+    obs_time = data.get("obsTimeLocal", "")
+
+    try:
+        temp = float(temp) if temp is not None else 0
+        humidity = float(humidity) if humidity is not None else 0
+        wind_speed = float(wind_speed) if wind_speed is not None else 0
+        precip_rate = float(precip_rate) if precip_rate is not None else 0
+        solar_radiation = float(solar_radiation) if solar_radiation is not None else 0
+        uv_index = float(uv_index) if uv_index is not None else 0
+    except (ValueError, TypeError):
+        temp = humidity = wind_speed = precip_rate = solar_radiation = uv_index = 0
+
+    is_day = True
+    try:
+        if obs_time and " " in obs_time:
+            time_parts = obs_time.split(" ")
+            if len(time_parts) > 1:
+                time_str = time_parts[1]
+                if ":" in time_str:
+                    is_day = 6 <= int(time_str.split(":")[0]) <= 18
+    except (ValueError, IndexError):
+        pass
+
+    if precip_rate > 0.0:
+        if temp <= 0:
+            return "snowy-rainy" if precip_rate > 0.1 else "snowy"
+        return "pouring" if precip_rate > 5.0 else "rainy"
+
+    if solar_radiation > 50 and is_day:
+        return "sunny" if humidity < 70 else "partlycloudy"
+
+    if humidity >= 95 and solar_radiation < 10:
+        return "fog"
+
+    if wind_speed > 20:
+        return "windy-variant" if solar_radiation < 50 else "windy"
+
+    if solar_radiation < 10 and not is_day:
+        return "clear-night"
+
+    if solar_radiation < 50:
+        return "cloudy"
+
+    return "exceptional"
+
+
+def random_columns(rows, seed=0, missing=0.02):
+    """Return columns of plausible observations with some missing values (NaN)."""
+    generator = np.random.default_rng(seed)
+    columns = {
+        "temp": generator.normal(10, 12, rows).round(1),
+        "humidity": generator.uniform(10, 100, rows).round(),
+        "wind_speed": generator.exponential(8, rows).round(1),
+        # Most observations are dry
+        "precip_rate": np.where(
+            generator.random(rows) < 0.7, 0.0, generator.exponential(3, rows).round(2)
+        ),
+        "solar_radiation": np.where(
+            generator.random(rows) < 0.4, 0.0, generator.uniform(0, 1000, rows).round(1)
+        ),
+        "hour": generator.integers(0, 24, rows).astype(float),
+    }
+    for values in columns.values():
+        values[generator.random(rows) < missing] = np.nan
+    return columns
+
+
+def payload(columns, row):
+    """Return the observations/current data of one row for reference_condition."""
+
+    def value(name):
+        item = columns[name][row]
+        return None if np.isnan(item) else float(item)
+
+    hour = columns["hour"][row]
+    return {
+        "humidity": value("humidity"),
+        "solarRadiation": value("solar_radiation"),
+        "obsTimeLocal": "" if np.isnan(hour) else f"2024-06-01 {int(hour):02d}:00:00",
+        "metric": {
+            "temp": value("temp"),
+            "windSpeed": value("wind_speed"),
+            "precipRate": value("precip_rate"),
+        },
+    }
+
+
+def classify(columns):
+    """Classify columns with the batch classifier and return condition names."""
+    codes = classify_conditions(
+        columns["temp"],
+        columns["humidity"],
+        columns["wind_speed"],
+        columns["precip_rate"],
+        columns["solar_radiation"],
+        columns["hour"],
+    )
+    return np.asarray(CONDITIONS, dtype=object)[codes]
+
+
+def main():
+    """Time both classifiers and check they agree on every row."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    columns = random_columns(args.rows, args.seed)
+    # Payload dicts are what the scalar function was fed, so building them isn't timed
+    payloads = [payload(columns, row) for row in range(args.rows)]
+
+    start = time.perf_counter()
+    expected = [reference_condition(data) for data in payloads]
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = classify(columns)
+    batch = time.perf_counter() - start
+
+    mismatches = int(np.count_nonzero(actual != np.asarray(expected, dtype=object)))
+    result = {
+        "rows": args.rows,
+        "scalar_s": round(scalar, 3),
+        "batch_s": round(batch, 3),
+        "scalar_rows_per_s": round(args.rows / scalar),
+        "batch_rows_per_s": round(args.rows / batch),
+        "speedup": round(scalar / batch, 1),
+        "mismatches": mismatches,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
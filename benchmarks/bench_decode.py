@@ -0,0 +1,137 @@
+"""Compare decoding each poll once with reading values from the raw payload.
+
+    python -m benchmarks.bench_decode --stations 1000 --json
+
+Before: the coordinator kept the parsed observations/current dict and every
+value read walked it again (observations list, units section, float()) via
+the if/elif chain the sensors used. After: decode_observation runs once per
+poll and reads index the Observation's values.
+
+An update is one response body parsed, then every sensor value read by its
+sensor entity and the values shown by the weather entity read again.
+Reported: CPU per update, peak traced memory of an update and the memory
+retained per station between polls.
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from custom_components.wunderground_weather.client import json_loads
+from custom_components.wunderground_weather.const import SENSOR_TYPES
+from custom_components.wunderground_weather.observation import FIELD_INDEX, decode_observation
+
+from .metrics import measure
+from .standin import load_fixture
+
+# Values the weather entity reads on every state write
+WEATHER_READS = ("temperature", "humidity", "pressure", "wind_speed", "wind_bearing", "dew_point")
+READS = list(SENSOR_TYPES) + list(WEATHER_READS)
+
+
+def raw_value(payload, sensor_type):
+    """Read a value from the raw payload like the sensors did before decoding."""
+    data = payload
+    if "observations" in data and isinstance(data["observations"], list) and data["observations"]:
+        data = data["observations"][0]
+    if not isinstance(data, dict):
+        return None
+    metric = data.get("metric", {})
+    try:
+        if sensor_type == "temperature":
+            value = metric.get("temp")
+        elif sensor_type == "humidity":
+            value = data.get("humidity")
+        elif sensor_type == "pressure":
+            value = metric.get("pressure")
+        elif sensor_type == "wind_speed":
+            value = metric.get("windSpeed")
+        elif sensor_type == "wind_gust":
+            value = metric.get("windGust")
+        elif sensor_type == "wind_bearing":
+            value = data.get("winddir")
+        elif sensor_type == "dew_point":
+            value = metric.get("dewpt")
+        elif sensor_type == "solar_radiation":
+            value = data.get("solarRadiation")
+        elif sensor_type == "uv":
+            value = data.get("uv")
+        elif sensor_type == "precip_rate":
+            value = metric.get("precipRate")
+        elif sensor_type == "precip_total":
+            value = metric.get("precipTotal")
+        else:
+            return None
+        return float(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def update_raw(body):
+    """Parse a response and read every value from the kept dict."""
+    payload = json_loads(body)
+    return payload, [raw_value(payload, sensor_type) for sensor_type in READS]
+
+
+def update_decoded(body):
+    """Parse and decode a response once, then read every value by index."""
+    observation = decode_observation(json_loads(body))
+    values = observation.values
+    return observation, [values[FIELD_INDEX[sensor_type]] for sensor_type in READS]
+
+
+def retained_per_station(update, bodies):
+    """Return the bytes kept per station when only update's state survives a poll."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [update(body)[0] for body in bodies]
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return round(retained / len(bodies))
+
+
+def run(stations, repeat):
+    """Measure both ways of updating."""
+    template = json.loads(load_fixture("observations.json"))
+    bodies = []
+    for index in range(stations):
+        template["observations"][0]["stationID"] = f"KBENCH{index:05d}"
+        template["observations"][0]["metric"]["temp"] = round(10 + index % 200 / 10, 1)
+        bodies.append(json.dumps(template).encode())
+
+    raw, decoded = update_raw(bodies[0])[1], update_decoded(bodies[0])[1]
+    assert raw == decoded, (raw, decoded)
+
+    results = {"stations": stations}
+    for name, update in (("raw", update_raw), ("decoded", update_decoded)):
+        cpu_ms, peak_kib = measure(lambda: update(bodies[0]), repeat)
+        results[name] = {
+            "cpu_per_update_us": round(1000 * cpu_ms, 2),
+            "peak_kib": peak_kib,
+            "retained_bytes_per_station": retained_per_station(update, bodies),
+        }
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20000, help="timed updates")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.stations, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name in ("raw", "decoded"):
+        print(f"{name} " + " ".join(f"{key}={value}" for key, value in results[name].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Poll N stations against the local stand-in and report the cost per poll.
+
+    python -m benchmarks.bench_poll --stations 1 10 100 500 --polls 5
+    python -m benchmarks.bench_poll --mode fetch --latency 0.05 --json
+
+In hub mode (default) every station is a config entry of a minimal Home
+Assistant instance, so a poll runs the hub, coordinator, decode and entity
+state writes. Fetch mode only calls api.fetch_weather_data with the
+integration's session, without Home Assistant. The stand-in runs in a
+subprocess unless --in-process is given, so its CPU isn't counted.
+
+Reported per N: poll latency percentiles, time the event loop was blocked,
+CPU per poll, peak RSS of the process so far and the requests the stand-in
+answered.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from contextlib import AsyncExitStack
+
+import aiohttp
+
+from custom_components.wunderground_weather.api import ApiKeyCache, fetch_weather_data
+from custom_components.wunderground_weather.client import create_session
+from custom_components.wunderground_weather.const import (
+    CONF_MAX_CONCURRENCY,
+    CONF_REQUEST_BUDGET,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_MAX_CONCURRENCY,
+)
+from custom_components.wunderground_weather.stats import StationStats
+
+from .hass import async_add_station, async_start_hass, async_stop_hass
+from .metrics import LoopMonitor, peak_rss_kib, percentile
+from .standin import StandInServer, fetch_stats, redirect, standin_process
+
+# Keeps the hub's own schedule from polling while rounds are measured
+IDLE_INTERVAL = 3600
+# Highest request budget the integration accepts, so rounds aren't throttled
+BENCH_REQUEST_BUDGET = 6000
+SETUP_TIMEOUT = 120
+
+
+def station_ids(count):
+    """Return count distinct station IDs."""
+    return [f"KBENCH{index:05d}" for index in range(count)]
+
+
+class _FetchDriver:
+    """Poll with api.fetch_weather_data only."""
+
+    def __init__(self, concurrency):
+        """Initialize the driver."""
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+        self._key_cache = ApiKeyCache()
+        self._stations = []
+
+    async def async_setup(self, stations):
+        """Open the session."""
+        self._session = create_session()
+        self._stations = stations
+
+    async def async_poll(self, station_id):
+        """Fetch the observation of a station."""
+        async with self._semaphore:
+            await fetch_weather_data(self._session, station_id, self._key_cache, StationStats())
+
+    def pollers(self):
+        """Return a poll function per station."""
+        return [
+            lambda station_id=station_id: self.async_poll(station_id)
+            for station_id in self._stations
+        ]
+
+    async def async_close(self):
+        """Close the session."""
+        await self._session.close()
+
+
+class _HubDriver:
+    """Poll config entries of a minimal Home Assistant instance."""
+
+    def __init__(self, concurrency):
+        """Initialize the driver."""
+        self._concurrency = concurrency
+        self._directory = tempfile.TemporaryDirectory()
+        self._hass = None
+        self._coordinators = []
+
+    async def async_setup(self, stations):
+        """Set up a config entry per station and wait for their first poll."""
+        self._hass = await async_start_hass(
+            self._directory.name,
+            {
+                CONF_MAX_CONCURRENCY: self._concurrency,
+                CONF_REQUEST_BUDGET: BENCH_REQUEST_BUDGET,
+            },
+        )
+        for station_id in stations:
+            self._coordinators.append(
+                await async_add_station(
+                    self._hass, station_id, {CONF_UPDATE_INTERVAL: IDLE_INTERVAL}
+                )
+            )
+        # Let the background first refreshes finish before measuring
+        async with asyncio.timeout(SETUP_TIMEOUT):
+            while any(coordinator.data is None for coordinator in self._coordinators):
+                await asyncio.sleep(0.01)
+
+    def pollers(self):
+        """Return a poll function per station."""
+        return [coordinator.async_refresh for coordinator in self._coordinators]
+
+    async def async_close(self):
+        """Stop Home Assistant."""
+        await async_stop_hass(self._hass)
+        self._directory.cleanup()
+
+
+async def _async_timed(poll, latencies):
+    """Run one poll and record its latency."""
+    start = time.perf_counter()
+    await poll()
+    latencies.append(time.perf_counter() - start)
+
+
+async def async_run(count, polls, mode, url, concurrency):
+    """Measure polls rounds of count stations against the stand-in at url."""
+    driver = _FetchDriver(concurrency) if mode == "fetch" else _HubDriver(concurrency)
+    async with aiohttp.ClientSession() as stats_session:
+        await driver.async_setup(station_ids(count))
+        try:
+            pollers = driver.pollers()
+            before = await fetch_stats(stats_session, url)
+            latencies = []
+            async with LoopMonitor() as monitor:
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                for _ in range(polls):
+                    await asyncio.gather(*(_async_timed(poll, latencies) for poll in pollers))
+                cpu = time.process_time() - cpu_start
+                wall = time.perf_counter() - wall_start
+            after = await fetch_stats(stats_session, url)
+        finally:
+            await driver.async_close()
+
+    total = count * polls
+    return {
+        "mode": mode,
+        "stations": count,
+        "polls": total,
+        "wall_s": round(wall, 3),
+        "latency_p50_ms": round(1000 * percentile(latencies, 0.50), 2),
+        "latency_p95_ms": round(1000 * percentile(latencies, 0.95), 2),
+        "latency_p99_ms": round(1000 * percentile(latencies, 0.99), 2),
+        **monitor.as_dict(),
+        "cpu_per_poll_ms": round(1000 * cpu / total, 3),
+        "peak_rss_kib": peak_rss_kib(),
+        "requests": {key: after[key] - before[key] for key in after},
+    }
+
+
+async def async_main(args):
+    """Run every station count against one stand-in."""
+    results = []
+    server_options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "rotate_after": args.rotate_after,
+    }
+    async with AsyncExitStack() as stack:
+        if args.in_process:
+            server = await stack.enter_async_context(StandInServer(**server_options))
+            url = server.url
+        else:
+            url = stack.enter_context(standin_process(**server_options))
+        stack.enter_context(redirect(url))
+        for count in args.stations:
+            results.append(
+                await async_run(count, args.polls, args.mode, url, args.concurrency)
+            )
+    return results
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--polls", type=int, default=5, help="rounds of polls per station")
+    parser.add_argument("--mode", choices=("hub", "fetch"), default="hub")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rotate-after", type=int, default=0)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="parallel requests (the hub's max_concurrency in hub mode)",
+    )
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        requests = result.pop("requests")
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+        print("  requests " + " ".join(f"{key}={value}" for key, value in requests.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the streaming API key scan with the BeautifulSoup parse.
+
+    python -m benchmarks.bench_scraper --sizes 100 450 1000 --json
+
+For each dashboard size (KiB) both extractions run on the padded page:
+streaming feeds the bytes to ApiKeyScanner in SCRAPE_CHUNK_SIZE chunks and
+stops at the key, the full parse decodes the whole page and runs
+parse_api_key, the fallback path. Reported: CPU per extraction, peak traced
+memory and the (decompressed) bytes each one had to read, offline and
+against the local stand-in (scrapes over a keep-alive session, no added
+latency).
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from custom_components.wunderground_weather import scraper
+from custom_components.wunderground_weather.client import create_session
+from custom_components.wunderground_weather.stats import StationStats
+
+from .metrics import measure
+from .standin import StandInServer, dashboard_page, redirect
+
+API_KEY = "0123456789abcdef0123456789abcdef"
+
+
+def scan(page):
+    """Return the key and the bytes read by the streaming scanner."""
+    scanner = scraper.ApiKeyScanner()
+    for start in range(0, len(page), scraper.SCRAPE_CHUNK_SIZE):
+        if api_key := scanner.feed(page[start : start + scraper.SCRAPE_CHUNK_SIZE]):
+            return api_key, scanner.bytes_scanned
+    raise ValueError("API key not found")
+
+
+def parse(page):
+    """Return the key and the bytes read by the full parse."""
+    return scraper.parse_api_key(page.decode("utf-8")), len(page)
+
+
+async def async_scrape(size, scrapes):
+    """Return wall ms per scrape and bytes received of both paths."""
+    results = {}
+    async with StandInServer(dashboard_size=size) as server:
+        session = create_session()
+        try:
+            with redirect(server.url):
+                for name, function in (
+                    ("streaming", scraper._scrape_api_key_streaming),
+                    ("full", scraper._scrape_api_key_full),
+                ):
+                    stats = StationStats()
+                    start = time.perf_counter()
+                    for _ in range(scrapes):
+                        assert await function(session, "KBENCH1", stats) == server.api_key
+                    wall = time.perf_counter() - start
+                    results[name] = {
+                        "scrape_ms": round(1000 * wall / scrapes, 3),
+                        "bytes_received": stats.bytes_received // scrapes,
+                    }
+        finally:
+            await session.close()
+    return results
+
+
+def run(size_kib, repeat):
+    """Measure both extractions on a page of size_kib."""
+    page = dashboard_page(API_KEY, size=size_kib * 1024).encode()
+    result = {"page_kib": round(len(page) / 1024, 1)}
+    for name, function in (("streaming", scan), ("full", parse)):
+        api_key, read = function(page)
+        assert api_key == API_KEY
+        cpu_ms, peak_kib = measure(lambda: function(page), repeat)
+        result[name] = {"cpu_ms": cpu_ms, "peak_kib": peak_kib, "bytes_read": read}
+    served = asyncio.run(async_scrape(size_kib * 1024, repeat))
+    for name, values in served.items():
+        result[name].update(values)
+    return result
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 450, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [run(size, args.repeat) for size in args.sizes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(f"page_kib={result['page_kib']}")
+        for name in ("streaming", "full"):
+            print(f"  {name} " + " ".join(f"{key}={value}" for key, value in result[name].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Measure the import time of the integration and the setup time of stations.
+
+    python -m benchmarks.bench_setup --stations 1 10 50 --json
+
+The import is timed in a fresh interpreter with -X importtime, loading the
+integration and its platforms the way Home Assistant does. Reported: the
+total, the integration's own modules and the dependencies that must not be
+imported on load (BeautifulSoup, NumPy). Setup starts a minimal Home
+Assistant instance with the integration against a stand-in subprocess and
+reports how long the start, every config entry and the first data of all
+stations took.
+
+Exits with 1 if a deferred dependency is imported on load.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+from custom_components.wunderground_weather.const import DOMAIN
+
+from .bench_poll import station_ids
+from .hass import async_add_station, async_start_hass, async_stop_hass
+from .metrics import percentile
+from .standin import redirect, standin_process
+
+PACKAGE = f"custom_components.{DOMAIN}"
+LOADED_MODULES = (PACKAGE, f"{PACKAGE}.sensor", f"{PACKAGE}.weather")
+# Only imported on the code paths that need them
+DEFERRED_MODULES = ("bs4", "numpy")
+HEAVIEST = 5
+SETUP_TIMEOUT = 120
+
+
+def import_times(modules=LOADED_MODULES):
+    """Import modules in a fresh interpreter and return the -X importtime summary."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines are "import time: self [us] | cumulative | imported package"
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(own), int(cumulative)))
+
+    top_level = [cumulative for name, _, cumulative in imports if name in modules]
+    integration = [item for item in imports if item[0].startswith(PACKAGE)]
+    return {
+        "total_ms": round(sum(top_level) / 1000, 1),
+        "integration_ms": round(sum(own for _, own, _ in integration) / 1000, 1),
+        "heaviest": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, _, cumulative in sorted(integration, key=lambda item: -item[2])[:HEAVIEST]
+        ],
+        "deferred_imported": sorted(
+            {name for name, _, _ in imports if name in DEFERRED_MODULES}
+        ),
+    }
+
+
+async def async_setup_times(count):
+    """Set up count stations and return how long each step took."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        start = time.perf_counter()
+        hass = await async_start_hass(config_dir)
+        started = time.perf_counter() - start
+        try:
+            entries = []
+            coordinators = []
+            for station_id in station_ids(count):
+                entry_start = time.perf_counter()
+                coordinators.append(await async_add_station(hass, station_id))
+                entries.append(time.perf_counter() - entry_start)
+            setup = time.perf_counter() - start
+            async with asyncio.timeout(SETUP_TIMEOUT):
+                while any(coordinator.data is None for coordinator in coordinators):
+                    await asyncio.sleep(0.005)
+            first_data = time.perf_counter() - start
+        finally:
+            await async_stop_hass(hass)
+
+    return {
+        "stations": count,
+        "start_ms": round(1000 * started, 1),
+        "entry_setup_p50_ms": round(1000 * percentile(entries, 0.50), 2),
+        "entry_setup_max_ms": round(1000 * max(entries), 2),
+        "all_entries_ms": round(1000 * setup, 1),
+        "first_data_ms": round(1000 * first_data, 1),
+    }
+
+
+async def async_main(args):
+    """Time the setup of every station count against one stand-in."""
+    with standin_process(latency=args.latency) as url, redirect(url):
+        return [await async_setup_times(count) for count in args.stations]
+
+
+def main():
+    """Run the benchmark, print the results and fail on deferred imports."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    imports = import_times()
+    setups = asyncio.run(async_main(args))
+    if args.json:
+        print(json.dumps({"import": imports, "setup": setups}, indent=2))
+    else:
+        heaviest = imports.pop("heaviest")
+        print("import " + " ".join(f"{key}={value}" for key, value in imports.items()))
+        for item in heaviest:
+            print(f"  {item['cumulative_ms']:>8} ms {item['module']}")
+        for result in setups:
+            print("setup " + " ".join(f"{key}={value}" for key, value in result.items()))
+    sys.exit(1 if imports["deferred_imported"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Minimal Home Assistant instance running the integration."""
+import logging
+
+from homeassistant import auth, config_entries, loader
+from homeassistant.bootstrap import async_load_base_functionality
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.wunderground_weather.const import CONF_STATION_ID, DOMAIN
+
+
+async def async_start_hass(config_dir, config=None):
+    """Return a Home Assistant instance with the integration set up.
+
+    Only what the integration depends on is loaded. The http server is set up
+    but never started, so no port is bound. config is the integration's
+    configuration.yaml section.
+    """
+    # Every run would warn that custom integrations aren't tested by Home Assistant
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+    hass = HomeAssistant(config_dir)
+    loader.async_setup(hass)
+    hass.config.skip_pip = True
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await async_load_base_functionality(hass)
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    if not await async_setup_component(hass, "http", {"http": {}}):
+        raise RuntimeError("http failed to set up")
+    if not await async_setup_component(hass, DOMAIN, {DOMAIN: config or {}}):
+        raise RuntimeError(f"{DOMAIN} failed to set up")
+    return hass
+
+
+async def async_add_station(hass, station_id, options=None):
+    """Add and set up a config entry of a station; return its coordinator."""
+    entry = config_entries.ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=station_id,
+        data={CONF_STATION_ID: station_id},
+        source=config_entries.SOURCE_USER,
+        options=options or {},
+    )
+    await hass.config_entries.async_add(entry)
+    if entry.state is not config_entries.ConfigEntryState.LOADED:
+        raise RuntimeError(f"Station {station_id} failed to set up: {entry.state}")
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+async def async_stop_hass(hass):
+    """Unload the stations and stop Home Assistant."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop(force=True)
@@ -0,0 +1,92 @@
+"""Measurements shared by the benchmarks."""
+import asyncio
+import resource
+import time
+import tracemalloc
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of values, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def peak_rss_kib():
+    """Return the peak resident set size of this process so far, in KiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class LoopMonitor:
+    """Measure how long the event loop is blocked.
+
+    A task sleeps for interval seconds at a time; any time it wakes up later
+    than that was spent running something else without yielding.
+    """
+
+    def __init__(self, interval=0.005):
+        """Initialize the monitor."""
+        self.interval = interval
+        self.lags = []
+        self._skip = False
+        self._task = None
+
+    async def __aenter__(self):
+        """Start sampling."""
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Stop sampling."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        """Record the lag of every wake-up."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            if self._skip:
+                self._skip = False
+                continue
+            self.lags.append(max(time.perf_counter() - start - self.interval, 0.0))
+
+    def reset(self):
+        """Forget the lags recorded so far, including the one in progress.
+
+        Call it after blocking the loop on purpose (e.g. to take a sample).
+        """
+        self.lags = []
+        self._skip = True
+
+    def as_dict(self):
+        """Return the total, p95 and max lag in milliseconds."""
+        return {
+            "blocked_ms": round(1000 * sum(self.lags), 2),
+            "lag_p95_ms": round(1000 * (percentile(self.lags, 0.95) or 0), 3),
+            "lag_max_ms": round(1000 * max(self.lags, default=0), 3),
+        }
+
+
+def measure(function, repeat):
+    """Call function repeat times; return CPU ms per call and peak traced KiB.
+
+    The peak is taken over a separate traced call so tracing doesn't slow
+    down the timed calls.
+    """
+    start = time.process_time()
+    for _ in range(repeat):
+        function()
+    cpu = time.process_time() - start
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return round(1000 * cpu / repeat, 4), round(peak / 1024, 1)
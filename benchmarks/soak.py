@@ -0,0 +1,284 @@
+"""Run the integration for many simulated hours and fail on sustained growth.
+
+    python -m benchmarks.soak --stations 10 --hours 48
+    python -m benchmarks.soak --hours 6 --sample-minutes 15 --json
+
+Stations are config entries of a minimal Home Assistant instance polling the
+local stand-in. The integration's clock is accelerated: every step advances
+it by the hub's tick interval and runs the hub's tick right away, so a
+simulated day takes seconds to minutes. At every sample the traced memory of
+the integration's modules, the number of live objects, the hub's state
+footprint and the real event loop lag are recorded.
+
+A series grows when, after the warm-up, every sample of the last third is
+above every sample of the first third by more than its tolerance. The top
+allocation sites of the integration's modules are reported either way; the
+exit status is 1 if anything grew.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+from unittest import mock
+
+from custom_components.wunderground_weather import api, coordinator, forecast, guard, hub, sensor
+from custom_components.wunderground_weather.const import (
+    ALLOCATION_SITES,
+    CONF_ARCHIVE_ENABLED,
+    CONF_UPDATE_INTERVAL,
+    DATA_HUB,
+    DOMAIN,
+    HUB_TICK_INTERVAL,
+)
+
+from .hass import async_add_station, async_start_hass, async_stop_hass
+from .metrics import LoopMonitor, percentile
+from .standin import StandInServer, redirect
+
+# Modules whose time module is replaced by the simulated clock
+CLOCKED_MODULES = (api, coordinator, forecast, guard, hub, sensor)
+INTEGRATION_FILTER = tracemalloc.Filter(True, f"*{os.sep}{DOMAIN}{os.sep}*")
+# Growth below these is noise: bytes, objects and footprint entries
+BYTES_TOLERANCE = 64 * 1024
+OBJECTS_TOLERANCE = 2000
+RELATIVE_TOLERANCE = 0.05
+GROWING_TYPES = 10
+
+
+class SimulatedClock:
+    """Stand-in for the time module that runs ahead of the real clock."""
+
+    def __init__(self):
+        """Initialize the clock at the real time."""
+        self.offset = 0.0
+
+    def advance(self, seconds):
+        """Move the clock forward."""
+        self.offset += seconds
+
+    def monotonic(self):
+        """Return the accelerated monotonic time."""
+        return time.monotonic() + self.offset
+
+    def time(self):
+        """Return the accelerated epoch time."""
+        return time.time() + self.offset
+
+    def __getattr__(self, name):
+        """Pass everything else to the time module."""
+        return getattr(time, name)
+
+
+def _flatten(values, prefix=""):
+    """Flatten nested numeric dicts into {"a.b": value}."""
+    flat = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def sustained_growth(series, warmup, tolerance):
+    """Return the growth of a series if it grew for good, else None.
+
+    The samples after the warm-up fraction are split in thirds; growth is
+    sustained when the lowest sample of the last third exceeds the highest of
+    the first third by more than tolerance(first).
+    """
+    values = series[int(len(series) * warmup):]
+    third = len(values) // 3
+    if third == 0:
+        return None
+    first, last = values[:third], values[-third:]
+    if min(last) - max(first) > tolerance(max(first)):
+        return min(last) - max(first)
+    return None
+
+
+class Soak:
+    """Drive the integration at an accelerated clock and sample its footprint."""
+
+    def __init__(self, stations, hours, sample_minutes, archive):
+        """Initialize the run."""
+        self.stations = stations
+        self.hours = hours
+        self.sample_minutes = sample_minutes
+        self.archive = archive
+        self.clock = SimulatedClock()
+        self.samples = []
+        # Snapshot and object types at the end of the warm-up and of the last sample
+        self._baseline = None
+        self._latest = None
+
+    def _sample(self, hass, monitor, baseline):
+        """Record one sample; baseline marks the end of the warm-up."""
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces([INTEGRATION_FILTER])
+        objects = gc.get_objects()
+        self._latest = (snapshot, Counter(type(item).__name__ for item in objects))
+        if baseline:
+            self._baseline = self._latest
+        self.samples.append(
+            {
+                "hour": round(self.clock.offset / 3600, 2),
+                "integration_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+                "traced_bytes": tracemalloc.get_traced_memory()[0],
+                "objects": len(objects),
+                "states": len(hass.states.async_all()),
+                "loop_lag_p95_ms": round(1000 * (percentile(monitor.lags, 0.95) or 0), 3),
+                "loop_lag_max_ms": round(1000 * max(monitor.lags, default=0), 3),
+                "footprint": _flatten(hass.data[DOMAIN][DATA_HUB].footprint()),
+            }
+        )
+        monitor.reset()
+        del objects
+
+    async def async_run(self, config_dir, warmup=0.25):
+        """Run the soak and return the report."""
+        options = {CONF_UPDATE_INTERVAL: 60, CONF_ARCHIVE_ENABLED: self.archive}
+        steps = int(self.hours * 3600 / HUB_TICK_INTERVAL)
+        sample_every = max(int(self.sample_minutes * 60 / HUB_TICK_INTERVAL), 1)
+        started = time.perf_counter()
+
+        with ExitStack() as stack:
+            for module in CLOCKED_MODULES:
+                stack.enter_context(mock.patch.object(module, "time", self.clock))
+            server = StandInServer(clock=self.clock.time, dashboard_size=64 * 1024)
+            async with server:
+                stack.enter_context(redirect(server.url))
+                hass = await async_start_hass(config_dir)
+                try:
+                    for index in range(self.stations):
+                        await async_add_station(hass, f"KSOAK{index:04d}", options)
+                    station_hub = hass.data[DOMAIN][DATA_HUB]
+                    # One frame is enough for allocation sites by line
+                    tracemalloc.start(1)
+                    async with LoopMonitor() as monitor:
+                        for step in range(steps):
+                            self.clock.advance(HUB_TICK_INTERVAL)
+                            await station_hub._async_tick()
+                            # Let listeners and background tasks run
+                            await asyncio.sleep(0)
+                            if step % sample_every == 0:
+                                baseline = self._baseline is None and step >= warmup * steps
+                                self._sample(hass, monitor, baseline)
+                        self._sample(hass, monitor, self._baseline is None)
+                finally:
+                    tracemalloc.stop()
+                    await async_stop_hass(hass)
+            requests = dict(server.stats)
+
+        return self._report(time.perf_counter() - started, requests, warmup)
+
+    def _report(self, wall, requests, warmup):
+        """Check every series for sustained growth and list the allocation sites."""
+
+        def relative(minimum):
+            """Return a tolerance of a share of the first third, at least minimum."""
+            return lambda first: max(minimum, RELATIVE_TOLERANCE * first)
+
+        series = {
+            "integration_bytes": relative(BYTES_TOLERANCE),
+            "traced_bytes": relative(BYTES_TOLERANCE),
+            "objects": relative(OBJECTS_TOLERANCE),
+            "states": lambda first: 0,
+        }
+        growth = {}
+        for name, tolerance in series.items():
+            grown = sustained_growth([sample[name] for sample in self.samples], warmup, tolerance)
+            if grown is not None:
+                growth[name] = grown
+        for name in self.samples[0]["footprint"]:
+            values = [sample["footprint"].get(name, 0) for sample in self.samples]
+            if (grown := sustained_growth(values, warmup, lambda first: 0)) is not None:
+                growth[f"footprint.{name}"] = grown
+
+        sites = self._latest[0].compare_to(self._baseline[0], "lineno")
+        types = self._latest[1].copy()
+        types.subtract(self._baseline[1])
+        return {
+            "stations": self.stations,
+            "simulated_hours": self.hours,
+            "wall_s": round(wall, 1),
+            "speedup": round(self.hours * 3600 / wall),
+            "requests": requests,
+            "samples": self.samples,
+            "growth": growth,
+            "allocation_sites": [
+                {
+                    "site": str(stat.traceback),
+                    "size_kib": round(stat.size / 1024, 1),
+                    "size_diff_kib": round(stat.size_diff / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in sites[:ALLOCATION_SITES]
+            ],
+            "growing_types": [
+                {"type": name, "count_diff": count}
+                for name, count in types.most_common(GROWING_TYPES)
+                if count > 0
+            ],
+        }
+
+
+def _print_report(report):
+    """Print a human-readable report."""
+    print(
+        f"{report['stations']} stations, {report['simulated_hours']} h simulated in "
+        f"{report['wall_s']} s ({report['speedup']}x), requests: {report['requests']}"
+    )
+    print(
+        f"{'hour':>7} {'integration':>12} {'traced':>10} {'objects':>9}"
+        f" {'lag p95':>8} {'lag max':>8}"
+    )
+    for sample in report["samples"]:
+        print(
+            f"{sample['hour']:>7} {sample['integration_bytes'] // 1024:>10} K"
+            f" {sample['traced_bytes'] // 1024:>8} K {sample['objects']:>9}"
+            f" {sample['loop_lag_p95_ms']:>8} {sample['loop_lag_max_ms']:>8}"
+        )
+    print("Top allocation sites since the warm-up:")
+    for site in report["allocation_sites"]:
+        print(f"  {site['size_diff_kib']:>+8} KiB {site['size_kib']:>8} KiB {site['site']}")
+    print("Growing object types: " + ", ".join(
+        f"{item['type']} +{item['count_diff']}" for item in report["growing_types"]
+    ))
+    if report["growth"]:
+        print("Sustained growth: " + ", ".join(
+            f"{name} +{value}" for name, value in report["growth"].items()
+        ))
+    else:
+        print("No sustained growth")
+
+
+def main():
+    """Run the soak and exit with 1 on sustained growth."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=10)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--sample-minutes", type=float, default=60)
+    parser.add_argument("--no-archive", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    soak = Soak(args.stations, args.hours, args.sample_minutes, not args.no_archive)
+    with tempfile.TemporaryDirectory() as config_dir:
+        report = asyncio.run(soak.async_run(config_dir))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    sys.exit(1 if report["growth"] else 0)
+
+
+if __name__ == "__main__":
+    main()
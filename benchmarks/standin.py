@@ -0,0 +1,357 @@
+"""Local stand-in for the Wunderground dashboard and the weather.com PWS API.
+
+Serves the recorded fixtures with configurable latency, errors and API key
+rotation, so the real fetch code can be driven without network:
+
+    async with StandInServer(latency=0.05) as server, redirect(server.url):
+        await fetch_weather_data(session, "KXXX1")
+
+Run it on its own (python -m benchmarks.standin) to keep the server's CPU
+out of the measurements of the client; it prints its URL on the first line
+and reports its counters on /_stats.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+DASHBOARD_PATH = "/dashboard/pws/{station_id}"
+OBSERVATIONS_PATH = "/v2/pws/observations/current"
+HISTORY_PATH = "/v2/pws/history/{resolution}"
+STATS_PATH = "/_stats"
+
+# Size of a real dashboard page and of the app state in it
+DASHBOARD_SIZE = 450 * 1024
+STATE_SIZE = 120 * 1024
+
+
+def load_fixture(name):
+    """Return the content of a fixture file."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+
+def dashboard_page(api_key, size=DASHBOARD_SIZE, state_size=STATE_SIZE):
+    """Return the dashboard fixture padded to a realistic size."""
+    page = load_fixture("dashboard.html").replace("{API_KEY}", api_key)
+    state = "".join(
+        f",&q;module{index}&q;:{{&q;id&q;:{index},&q;text&q;:&q;{'x' * 48}&q;}}"
+        for index in range(max(state_size, 0) // 80)
+    )
+    page = page.replace("<!-- STATE PADDING -->", state)
+    markup = "".join(
+        f'<div class="module-{index}"><span>{"y" * 40}</span></div>\n'
+        for index in range(max(size - len(page), 0) // 72)
+    )
+    return page.replace("<!-- PADDING -->", markup)
+
+
+@contextmanager
+def redirect(url):
+    """Point the integration's upstream URLs at a stand-in."""
+    from custom_components.wunderground_weather import api, forecast, scraper
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            mock.patch.object(scraper, "DASHBOARD_URL", url + DASHBOARD_PATH)
+        )
+        stack.enter_context(
+            mock.patch.object(api, "OBSERVATIONS_URL", url + OBSERVATIONS_PATH)
+        )
+        stack.enter_context(mock.patch.object(api, "HISTORY_URL", url + HISTORY_PATH))
+        stack.enter_context(
+            mock.patch.dict(
+                forecast.FORECAST_URLS,
+                {kind: f"{url}/v3/wx/forecast/{kind}" for kind in forecast.FORECAST_URLS},
+            )
+        )
+        yield
+
+
+class StandInServer:
+    """aiohttp server answering like the upstream hosts.
+
+    latency and jitter (seconds) delay every API answer, error_rate is the
+    share of API requests answered with a 500 and after rotate_after
+    successful API requests the key changes, so the old one gets a 401 and
+    has to be scraped again. clock returns the epoch time of the served
+    observations.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        rotate_after=0,
+        dashboard_size=DASHBOARD_SIZE,
+        compress=True,
+        clock=time.time,
+        seed=0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        """Initialize the server."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rotate_after = rotate_after
+        self.dashboard_size = dashboard_size
+        self.compress = compress
+        self.clock = clock
+        self.host = host
+        self.port = port
+        self.url = None
+        self._random = random.Random(seed)
+        self._observation = json.loads(load_fixture("observations.json"))["observations"][0]
+        self._pages = {}
+        self._runner = None
+        self._key_generation = 0
+        self._accepted = 0
+        self.stats = {
+            "dashboard": 0,
+            "observations": 0,
+            "history": 0,
+            "rejected_key": 0,
+            "errors": 0,
+            "not_found": 0,
+            "bytes_sent": 0,
+            "bytes_uncompressed": 0,
+        }
+
+    @property
+    def api_key(self):
+        """Return the key currently accepted by the API."""
+        return f"standin{self._key_generation:04d}{'0' * 20}"
+
+    async def __aenter__(self):
+        """Start the server."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Stop the server."""
+        await self.stop()
+
+    async def start(self):
+        """Listen on host and port (0 picks a free port)."""
+        app = web.Application()
+        app.router.add_get(DASHBOARD_PATH, self._dashboard)
+        app.router.add_get(OBSERVATIONS_PATH, self._observations)
+        app.router.add_get(HISTORY_PATH, self._history)
+        app.router.add_get(STATS_PATH, self._stats)
+        app.router.add_route("*", "/{tail:.*}", self._not_found)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self.host}:{port}"
+
+    async def stop(self):
+        """Close the server and its connections."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _respond(self, request, body, content_type, status=200):
+        """Return body, gzip compressed if the client accepts it."""
+        self.stats["bytes_uncompressed"] += len(body)
+        headers = {}
+        if self.compress and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        self.stats["bytes_sent"] += len(body)
+        return web.Response(
+            body=body, status=status, content_type=content_type, headers=headers
+        )
+
+    async def _api_answer(self, request):
+        """Delay, fail or reject an API request; None if it may be answered."""
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if request.query.get("apiKey") != self.api_key:
+            self.stats["rejected_key"] += 1
+            return web.Response(status=401, text="Invalid apiKey.")
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=500, text="Internal Server Error")
+        self._accepted += 1
+        if self.rotate_after and self._accepted % self.rotate_after == 0:
+            # This answer is the last one accepted with the current key
+            self._key_generation += 1
+        return None
+
+    async def _dashboard(self, request):
+        """Serve the dashboard page with the current key."""
+        self.stats["dashboard"] += 1
+        api_key = self.api_key
+        if (body := self._pages.get(api_key)) is None:
+            self._pages = {
+                api_key: dashboard_page(api_key, self.dashboard_size).encode()
+            }
+            body = self._pages[api_key]
+        return self._respond(request, body, "text/html")
+
+    def _row(self, station_id, epoch, step):
+        """Return the fixture observation moved to epoch, varied by step."""
+        row = dict(self._observation)
+        obs_time = datetime.fromtimestamp(epoch, timezone.utc)
+        row["stationID"] = station_id
+        row["epoch"] = epoch
+        row["obsTimeUtc"] = obs_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+        row["obsTimeLocal"] = (obs_time - timedelta(hours=4)).strftime("%Y-%m-%d %H:%M:%S")
+        row["solarRadiation"] = round(400 + 40 * (step % 7), 1)
+        for section in ("metric", "imperial"):
+            values = row[section] = dict(row[section])
+            values["temp"] = round(values["temp"] + 0.1 * (step % 11), 1)
+            values["windSpeed"] = round(values["windSpeed"] + 0.5 * (step % 5), 1)
+        return row
+
+    async def _observations(self, request):
+        """Serve the current observation of a station."""
+        self.stats["observations"] += 1
+        if (response := await self._api_answer(request)) is not None:
+            return response
+        epoch = int(self.clock())
+        # A new observation every minute, like a station uploading each minute
+        epoch -= epoch % 60
+        row = self._row(request.query.get("stationId", ""), epoch, epoch // 60)
+        body = json.dumps({"observations": [row]}).encode()
+        return self._respond(request, body, "application/json")
+
+    async def _history(self, request):
+        """Serve a day of hourly history of a station."""
+        self.stats["history"] += 1
+        if (response := await self._api_answer(request)) is not None:
+            return response
+        try:
+            day = datetime.strptime(request.query.get("date", ""), "%Y%m%d")
+        except ValueError:
+            return web.Response(status=400, text="Invalid date.")
+        rows = []
+        for hour in range(24):
+            epoch = int(day.replace(hour=hour, tzinfo=timezone.utc).timestamp())
+            current = self._row(request.query.get("stationId", ""), epoch, hour)
+            row = {
+                key: current[key]
+                for key in ("stationID", "obsTimeUtc", "obsTimeLocal", "epoch", "lat", "lon")
+            }
+            row["humidityAvg"] = row["humidityHigh"] = row["humidityLow"] = current["humidity"]
+            row["solarRadiationHigh"] = current["solarRadiation"]
+            row["uvHigh"] = current["uv"]
+            row["winddirAvg"] = current["winddir"]
+            for section in ("metric", "imperial"):
+                values = current[section]
+                row[section] = {
+                    "tempAvg": values["temp"],
+                    "tempHigh": values["temp"] + 0.5,
+                    "tempLow": values["temp"] - 0.5,
+                    "windspeedAvg": values["windSpeed"],
+                    "windspeedHigh": values["windSpeed"],
+                    "windspeedLow": values["windSpeed"],
+                    "windgustAvg": values["windGust"],
+                    "windgustHigh": values["windGust"],
+                    "windgustLow": values["windGust"],
+                    "dewptAvg": values["dewpt"],
+                    "dewptHigh": values["dewpt"],
+                    "dewptLow": values["dewpt"],
+                    "pressureMax": values["pressure"],
+                    "pressureMin": values["pressure"],
+                    "precipRate": values["precipRate"],
+                    "precipTotal": values["precipTotal"],
+                }
+            rows.append(row)
+        body = json.dumps({"observations": rows}).encode()
+        return self._respond(request, body, "application/json")
+
+    async def _stats(self, request):
+        """Return the request counters."""
+        return web.json_response(self.stats)
+
+    async def _not_found(self, request):
+        """Answer paths the stand-in doesn't serve (e.g. forecasts)."""
+        self.stats["not_found"] += 1
+        return web.Response(status=404, text="Not Found")
+
+
+@contextmanager
+def standin_process(**options):
+    """Run a stand-in in a subprocess and yield its URL.
+
+    Keeps the server's CPU time out of the process being measured. options
+    are the StandInServer arguments that can be given on the command line.
+    """
+    import subprocess
+
+    args = [sys.executable, "-m", "benchmarks.standin"]
+    for name, value in options.items():
+        args += [f"--{name.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        url = process.stdout.readline().strip()
+        if not url:
+            raise RuntimeError("Stand-in server failed to start")
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def fetch_stats(session, url):
+    """Return the counters of a running stand-in."""
+    async with session.get(url + STATS_PATH) as response:
+        return await response.json()
+
+
+def main():
+    """Serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rotate-after", type=int, default=0)
+    parser.add_argument("--dashboard-size", type=int, default=DASHBOARD_SIZE)
+    parser.add_argument("--compress", type=int, choices=(0, 1), default=1)
+    args = parser.parse_args()
+
+    async def serve():
+        server = StandInServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rotate_after=args.rotate_after,
+            dashboard_size=args.dashboard_size,
+            compress=bool(args.compress),
+            port=args.port,
+        )
+        async with server:
+            print(server.url, flush=True)
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
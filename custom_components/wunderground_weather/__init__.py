@@ -1,23 +1,100 @@
 """The Wunderground Weather integration."""
 import logging
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from .weather import fetch_weather_data
-from datetime import timedelta
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+from .coordinator import WundergroundCoordinator
+from .hub import async_get_hub
+from .push import WundergroundPushView
 
 from .const import (
     DOMAIN,
     DEFAULT_UPDATE_INTERVAL,
     CONF_UPDATE_INTERVAL,
     CONF_STATION_NAME,
+    CONF_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    CONF_REQUEST_BUDGET,
+    DEFAULT_REQUEST_BUDGET,
+    CONF_POLLING_MODE,
+    DEFAULT_POLLING_MODE,
+    CONF_SENSOR_TYPES,
+    SENSOR_TYPES,
+    POLLING_MODE_ADAPTIVE,
+    CONF_STATION_ID,
+    SERVICE_BACKFILL,
+    BACKFILL_RESOLUTIONS,
+    ATTR_START_DATE,
+    ATTR_END_DATE,
+    ATTR_RESOLUTION,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["weather", "sensor"]
 
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+                vol.Optional(
+                    CONF_REQUEST_BUDGET, default=DEFAULT_REQUEST_BUDGET
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=6000)),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_STATION_ID): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_RESOLUTION, default="hourly"): vol.In(BACKFILL_RESOLUTIONS),
+    }
+)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration-wide options from configuration.yaml."""
+    hass.data.setdefault(DOMAIN, {})
+    if DOMAIN in config:
+        hass.data[DOMAIN][CONF_MAX_CONCURRENCY] = config[DOMAIN][CONF_MAX_CONCURRENCY]
+        hass.data[DOMAIN][CONF_REQUEST_BUDGET] = config[DOMAIN][CONF_REQUEST_BUDGET]
+
+    async def async_handle_backfill(call: ServiceCall) -> None:
+        """Backfill long-term statistics of a station from its history."""
+        hub = async_get_hub(hass)
+        station_id = call.data[CONF_STATION_ID]
+        start, end = call.data[ATTR_START_DATE], call.data[ATTR_END_DATE]
+        if not hub.has_station(station_id):
+            raise ServiceValidationError(f"Station {station_id} is not configured")
+        if start > end:
+            raise ServiceValidationError("start_date must not be after end_date")
+        hub.backfill.async_start(station_id, start, end, call.data[ATTR_RESOLUTION])
+
+    hass.services.async_register(DOMAIN, SERVICE_BACKFILL, async_handle_backfill, BACKFILL_SCHEMA)
+    hass.http.register_view(WundergroundPushView(hass))
+
+    async def async_flush_archive(_event: Event) -> None:
+        """Write the buffered archive observations on shutdown."""
+        await async_get_hub(hass).archive.async_flush()
+
+    async def async_close_session(_event: Event) -> None:
+        """Close the hub's connection pool on shutdown."""
+        await async_get_hub(hass).session.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_FINAL_WRITE, async_flush_archive)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, async_close_session)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Wunderground Weather from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -29,20 +106,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.info("Setting up Wunderground Weather for station %s with update interval %d seconds", 
                 entry.data["station_id"], update_interval)
     
-    # Initialize the coordinator
-    session = async_get_clientsession(hass)
+    # Initialize the coordinator, polling is scheduled by the shared hub
+    hub = async_get_hub(hass)
+    await hub.async_load()
     station_id = entry.data["station_id"]
     
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"wunderground_weather_{station_id}",
-        update_method=lambda: fetch_weather_data(session, station_id),
-        update_interval=timedelta(seconds=update_interval),
+    coordinator = WundergroundCoordinator(hass, hub, station_id)
+    
+    # Serve the last persisted observation until the first poll completes
+    if (observation := hub.snapshot.get_observation(station_id)) is not None:
+        coordinator.restore(observation)
+    # The first poll runs in the background, setup doesn't wait on the network
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"wunderground_weather_refresh_{station_id}"
     )
+    adaptive = entry.options.get(CONF_POLLING_MODE, DEFAULT_POLLING_MODE) == POLLING_MODE_ADAPTIVE
     
     # Store coordinator in hass data
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    hub.async_register(station_id, coordinator, update_interval, adaptive)
     
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -50,15 +132,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Register options update listener
     entry.async_on_unload(entry.add_update_listener(async_update_options))
     
+    # Continue a history backfill interrupted by a restart
+    hub.backfill.async_resume(station_id)
+    
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        hub = async_get_hub(hass)
+        hub.async_unregister(entry.data["station_id"])
+        await hub.async_close()
 
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the persisted snapshot of a removed station."""
+    hub = async_get_hub(hass)
+    await hub.async_load()
+    hub.snapshot.async_remove(entry.data["station_id"])
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update options for the Wunderground Weather integration."""
     # Get the new update interval from options
@@ -70,8 +164,14 @@ async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     # Get the coordinator
     coordinator = hass.data[DOMAIN][entry.entry_id]
     
-    # Update the coordinator's update interval
-    coordinator.update_interval = timedelta(seconds=update_interval)
+    # Entities are created per selected sensor type, so a new selection reloads
+    if frozenset(entry.options.get(CONF_SENSOR_TYPES, SENSOR_TYPES)) != coordinator.sensor_types:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    
+    # Update the station's interval and polling mode on the hub scheduler
+    adaptive = entry.options.get(CONF_POLLING_MODE, DEFAULT_POLLING_MODE) == POLLING_MODE_ADAPTIVE
+    async_get_hub(hass).async_set_schedule(entry.data["station_id"], update_interval, adaptive)
     
     # Log the update interval change
     _LOGGER.info("Update interval changed to %d seconds for station %s", 
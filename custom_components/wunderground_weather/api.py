@@ -0,0 +1,178 @@
+"""Client for the Wunderground dashboard and the weather.com PWS API."""
+import logging
+import time
+
+import aiohttp
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .client import json_loads
+from .const import DEFAULT_API_KEY_TTL, HISTORY_URL, OBSERVATIONS_URL, UNITS_METRIC
+from .scraper import scrape_api_key
+from .singleflight import SingleFlight
+from .stats import StationStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ApiKeyCache:
+    """Shared cache for the SUN_API_KEY scraped from the Wunderground dashboard."""
+
+    def __init__(self, ttl=DEFAULT_API_KEY_TTL):
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._key = None
+        self._expires = 0.0
+        self.fetched_at = None
+        # Scrapes are coalesced, so a burst of misses or 401s scrapes once
+        self._scrapes = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @property
+    def valid(self):
+        """Return True if a cached key is present and not expired."""
+        return self._key is not None and time.monotonic() < self._expires
+
+    @property
+    def key(self):
+        """Return the cached key, even if expired."""
+        return self._key
+
+    def restore(self, key, fetched_at):
+        """Restore a persisted key scraped at the given epoch time."""
+        remaining = self._ttl - (time.time() - fetched_at)
+        if key and remaining > 0 and self._key is None:
+            self._key = key
+            self._expires = time.monotonic() + remaining
+            self.fetched_at = fetched_at
+
+    @property
+    def stats(self):
+        """Return the cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "scrapes_coalesced": self._scrapes.coalesced,
+        }
+
+    async def async_get(self, session, station_id, stats=None):
+        """Return the cached key, scraping the dashboard if needed."""
+        if self.valid:
+            self.hits += 1
+            return self._key
+
+        self.misses += 1
+        return await self._scrapes.async_do(
+            "scrape", lambda: self._async_refresh(session, station_id, stats)
+        )
+
+    async def async_invalidate(self, session, station_id, rejected_key, stats=None):
+        """Drop a key rejected by the API and scrape a new one."""
+        if self._key != rejected_key and self.valid:
+            # Already refreshed by a concurrent caller
+            return self._key
+        if self._key == rejected_key:
+            _LOGGER.info("API key rejected, re-scraping dashboard for station %s", station_id)
+            self._key = None
+        return await self._scrapes.async_do(
+            "scrape", lambda: self._async_refresh(session, station_id, stats)
+        )
+
+    async def _async_refresh(self, session, station_id, stats=None):
+        """Scrape a fresh key and store it."""
+        self.refreshes += 1
+        self._key = await scrape_api_key(session, station_id, stats)
+        self._expires = time.monotonic() + self._ttl
+        self.fetched_at = time.time()
+        return self._key
+
+
+async def fetch_observation(session, station_id, api_key, stats=None, units=UNITS_METRIC):
+    """Fetch the current observation for a station from the weather.com API."""
+    if stats is None:
+        stats = StationStats()
+    params = {
+        "apiKey": api_key,
+        "stationId": station_id,
+        "numericPrecision": "decimal",
+        "format": "json",
+        "units": units,
+    }
+    return await async_get_json(session, OBSERVATIONS_URL, params, stats)
+
+
+async def fetch_history(
+    session, station_id, api_key, date, resolution, stats=None, units=UNITS_METRIC
+):
+    """Fetch the PWS history of one day ("hourly", "daily" or "all")."""
+    if stats is None:
+        stats = StationStats()
+    params = {
+        "apiKey": api_key,
+        "stationId": station_id,
+        "numericPrecision": "decimal",
+        "format": "json",
+        "units": units,
+        "date": date.strftime("%Y%m%d"),
+    }
+    url = HISTORY_URL.format(resolution=resolution)
+    return await async_get_json(session, url, params, stats)
+
+
+async def async_get_json(session, url, params, stats):
+    """GET a weather.com API endpoint and decode its JSON body."""
+    with stats.time("api"):
+        async with session.get(url, params=params) as api_response:
+            api_response.raise_for_status()
+            if api_response.status == 204:
+                # weather.com answers 204 when there is no data
+                return None
+            body = await api_response.read()
+    stats.add_bytes(len(body))
+
+    with stats.time("api_decode", sync=True):
+        return json_loads(body)
+
+
+async def async_with_api_key(session, station_id, key_cache, stats, request):
+    """Call request(api_key), re-scraping the key once if the API rejects it."""
+    api_key = await key_cache.async_get(session, station_id, stats)
+    try:
+        return await request(api_key)
+    except aiohttp.ClientResponseError as e:
+        if e.status not in (401, 403):
+            raise
+        api_key = await key_cache.async_invalidate(session, station_id, api_key, stats)
+        return await request(api_key)
+
+
+async def fetch_weather_data(
+    session, station_id, key_cache=None, stats=None, units=UNITS_METRIC
+):
+    """Fetch weather data asynchronously."""
+    _LOGGER.debug("Fetching weather data for station %s", station_id)
+    if key_cache is None:
+        key_cache = ApiKeyCache()
+    if stats is None:
+        stats = StationStats()
+
+    try:
+        data = await async_with_api_key(
+            session,
+            station_id,
+            key_cache,
+            stats,
+            lambda api_key: fetch_observation(session, station_id, api_key, stats, units),
+        )
+
+        _LOGGER.debug(
+            "Successfully fetched weather data for station %s (key cache: %s)",
+            station_id,
+            key_cache.stats,
+        )
+        return data
+
+    except Exception as e:
+        raise UpdateFailed(f"Error fetching weather data for station {station_id}: {e}") from e
@@ -0,0 +1,115 @@
+"""Batched writing of decoded observations to the archive.
+
+The block format and ArchiveReader live in archive_format, which doesn't
+depend on Home Assistant.
+"""
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .archive_format import write_batches
+from .const import (
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_DIRECTORY,
+    ARCHIVE_FLUSH_DELAY,
+    ARCHIVE_MAX_FILE_SIZE,
+    ARCHIVE_MAX_RETAINED,
+    SENSOR_TYPES,
+    UNITS_METRIC,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ObservationArchive:
+    """Buffer observations in memory and flush them in batches off the event loop.
+
+    A batch is flushed once ARCHIVE_BATCH_SIZE observations are buffered or
+    ARCHIVE_FLUSH_DELAY seconds after the first buffered one.
+    """
+
+    def __init__(self, hass: HomeAssistant, units=UNITS_METRIC, root=None):
+        """Initialize the archive."""
+        self.hass = hass
+        self.units = units
+        self.root = root or hass.config.path(ARCHIVE_DIRECTORY)
+        self._buffer = {}
+        self._buffered = 0
+        self._lock = asyncio.Lock()
+        self._unsub_flush = None
+        self.archived = 0
+        self.flushes = 0
+
+    @callback
+    def async_add(self, station_id, observation):
+        """Buffer an observation of a station."""
+        if observation.obs_time is None:
+            return
+        self._buffer.setdefault(station_id, []).append(
+            (int(observation.obs_time.timestamp()), observation.values)
+        )
+        self._buffered += 1
+        if self._buffered >= ARCHIVE_BATCH_SIZE:
+            self.hass.async_create_background_task(
+                self.async_flush(), "wunderground_weather_archive_flush"
+            )
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, ARCHIVE_FLUSH_DELAY, self._async_scheduled_flush
+            )
+
+    async def _async_scheduled_flush(self, _now):
+        """Flush after the delay."""
+        self._unsub_flush = None
+        await self.async_flush()
+
+    async def async_flush(self):
+        """Write the buffered observations."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if not self._buffered:
+            return
+        batches, self._buffer = self._buffer, {}
+        count, self._buffered = self._buffered, 0
+        async with self._lock:
+            failed = await self.hass.async_add_executor_job(
+                write_batches,
+                self.root,
+                batches,
+                list(SENSOR_TYPES),
+                self.units,
+                ARCHIVE_MAX_FILE_SIZE,
+            )
+        for station_id, rows in failed.items():
+            count -= len(rows)
+            self._retain(station_id, rows)
+        self.archived += count
+        self.flushes += 1
+
+    @callback
+    def _retain(self, station_id, rows):
+        """Put rows that couldn't be written back in front of the buffer."""
+        rows = rows + self._buffer.get(station_id, [])
+        dropped = max(0, len(rows) - ARCHIVE_MAX_RETAINED)
+        if dropped:
+            _LOGGER.warning(
+                "Dropping %d unwritten archive observations of %s", dropped, station_id
+            )
+            rows = rows[dropped:]
+        self._buffered += len(rows) - len(self._buffer.get(station_id, []))
+        self._buffer[station_id] = rows
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, ARCHIVE_FLUSH_DELAY, self._async_scheduled_flush
+            )
+
+    def as_dict(self):
+        """Return the archive counters."""
+        return {
+            "buffered": self._buffered,
+            "archived": self.archived,
+            "flushes": self.flushes,
+        }
@@ -0,0 +1,214 @@
+"""Block format of the observation archive.
+
+Each station has a directory of rotating files. A file is a sequence of
+blocks, one per flush:
+
+    header   magic, row count, min and max observation time (epoch seconds)
+    times    row count int64, sorted
+    values   one float64 column of row count values per field, NaN if missing
+
+The index.json next to the files records the field order, the file being
+appended to and the units, min/max time and row count of every file, so
+range queries only map the files and blocks that overlap the range. A new
+file is started when the units change.
+
+This module only uses the standard library and has no package imports, so
+it can be loaded on its own to read an archive outside Home Assistant.
+"""
+import bisect
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timezone
+
+_LOGGER = logging.getLogger(__name__)
+
+BLOCK_MAGIC = b"WUA1"
+BLOCK_HEADER = struct.Struct("<4sIqq")
+INDEX_FILE = "index.json"
+FILE_SUFFIX = ".wua"
+# Same as UNITS_METRIC, the units of archives written before units were recorded
+DEFAULT_UNITS = "m"
+
+
+def _encode_block(rows, field_count):
+    """Encode (epoch, values) rows sorted by time into one block."""
+    rows = sorted(rows, key=lambda row: row[0])
+    times = array("q", (row[0] for row in rows))
+    parts = [BLOCK_HEADER.pack(BLOCK_MAGIC, len(rows), times[0], times[-1]), times.tobytes()]
+    for index in range(field_count):
+        column = array(
+            "d", (math.nan if row[1][index] is None else row[1][index] for row in rows)
+        )
+        parts.append(column.tobytes())
+    return b"".join(parts)
+
+
+def _load_index(directory, fields=()):
+    """Return the index of a station directory, a new one with fields if missing."""
+    try:
+        with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {"fields": list(fields), "current": None, "files": {}}
+
+
+def _save_index(directory, index):
+    """Replace the index of a station directory atomically."""
+    path = os.path.join(directory, INDEX_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(f"{path}.tmp", path)
+
+
+def _write_station(directory, rows, fields, units, max_file_size):
+    """Append one block to the current file of a station, rotating when full."""
+    os.makedirs(directory, exist_ok=True)
+    index = _load_index(directory, fields)
+    block = _encode_block(rows, len(index["fields"]))
+
+    current = index.get("current")
+    if (
+        current is None
+        or index["files"][current].get("units", DEFAULT_UNITS) != units
+        or os.path.getsize(os.path.join(directory, current)) + len(block) > max_file_size
+    ):
+        current = f"{len(index['files']):06d}{FILE_SUFFIX}"
+        index["current"] = current
+        index["files"][current] = {"units": units, "min": None, "max": None, "rows": 0}
+
+    with open(os.path.join(directory, current), "ab") as file:
+        file.write(block)
+
+    entry = index["files"][current]
+    _, count, low, high = BLOCK_HEADER.unpack_from(block)
+    entry["min"] = low if entry["min"] is None else min(entry["min"], low)
+    entry["max"] = high if entry["max"] is None else max(entry["max"], high)
+    entry["rows"] += count
+    _save_index(directory, index)
+
+
+def write_batches(root, batches, fields, units, max_file_size):
+    """Append one block per station and return the batches that failed.
+
+    A station that can't be written doesn't stop the others; its rows are
+    returned so they can be retried. Blocking, use an executor.
+    """
+    failed = {}
+    for station_id, rows in batches.items():
+        try:
+            _write_station(
+                os.path.join(root, station_id), rows, fields, units, max_file_size
+            )
+        except OSError as err:
+            _LOGGER.error(
+                "Error writing %d observations of %s to the archive: %s",
+                len(rows),
+                station_id,
+                err,
+            )
+            failed[station_id] = rows
+    return failed
+
+
+class ArchiveReader:
+    """Memory-mapped range queries over the archive; blocking, use an executor."""
+
+    def __init__(self, root):
+        """Initialize the reader."""
+        self.root = root
+
+    def stations(self):
+        """Return the archived station IDs."""
+        try:
+            return sorted(
+                name
+                for name in os.listdir(self.root)
+                if os.path.isfile(os.path.join(self.root, name, INDEX_FILE))
+            )
+        except FileNotFoundError:
+            return []
+
+    def query(self, station_id, start=None, end=None, units=DEFAULT_UNITS):
+        """Return the observations of a station between start and end (inclusive).
+
+        Only files written in the given units ("m" or "e") are read. The result
+        maps "time" to a list of UTC datetimes and every field to a list of
+        values (None if missing), ordered by time.
+        """
+        low = -(2**63) if start is None else int(start.timestamp())
+        high = 2**63 - 1 if end is None else int(end.timestamp())
+        directory = os.path.join(self.root, station_id)
+        index = _load_index(directory)
+        fields = index["fields"]
+        times = []
+        columns = [[] for _ in fields]
+
+        for name, entry in sorted(index["files"].items()):
+            if (
+                not entry["rows"]
+                or entry.get("units", DEFAULT_UNITS) != units
+                or entry["max"] < low
+                or entry["min"] > high
+            ):
+                continue
+            self._scan_file(os.path.join(directory, name), len(fields), low, high, times, columns)
+
+        order = sorted(range(len(times)), key=times.__getitem__)
+        result = {
+            "time": [datetime.fromtimestamp(times[row], timezone.utc) for row in order]
+        }
+        for field, column in zip(fields, columns):
+            result[field] = [None if math.isnan(column[row]) else column[row] for row in order]
+        return result
+
+    @staticmethod
+    def _scan_file(path, field_count, low, high, times, columns):
+        """Add the rows of one file within [low, high] to times and columns."""
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    offset = 0
+                    while offset + BLOCK_HEADER.size <= size:
+                        magic, count, block_min, block_max = BLOCK_HEADER.unpack_from(view, offset)
+                        block_size = BLOCK_HEADER.size + 8 * count * (1 + field_count)
+                        if magic != BLOCK_MAGIC or offset + block_size > size:
+                            _LOGGER.warning("Truncated archive block in %s", path)
+                            break
+                        if block_max >= low and block_min <= high:
+                            start = offset + BLOCK_HEADER.size
+                            block_times = view[start : start + 8 * count].cast("q")
+                            first = bisect.bisect_left(block_times, low)
+                            last = bisect.bisect_right(block_times, high)
+                            times.extend(block_times[first:last].tolist())
+                            for index, column in enumerate(columns):
+                                column_start = start + 8 * count * (1 + index)
+                                values = view[column_start : column_start + 8 * count].cast("d")
+                                column.extend(values[first:last].tolist())
+                                values.release()
+                            block_times.release()
+                        offset += block_size
+                finally:
+                    view.release()
+
+
+if __name__ == "__main__":
+    import csv
+    import sys
+
+    if len(sys.argv) not in (3, 4):
+        sys.exit(f"usage: {sys.argv[0]} ARCHIVE_DIRECTORY STATION_ID [m|e]")
+    result = ArchiveReader(sys.argv[1]).query(
+        sys.argv[2], units=sys.argv[3] if len(sys.argv) == 4 else DEFAULT_UNITS
+    )
+    writer = csv.writer(sys.stdout)
+    writer.writerow(result)
+    writer.writerows(zip(*result.values()))
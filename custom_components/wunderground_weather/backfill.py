@@ -0,0 +1,296 @@
+"""Backfill long-term statistics from the weather.com PWS history."""
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    SENSOR_STATE_CLASSES,
+    HISTORY_FIELDS,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_PROGRESS_EVENT,
+    BACKFILL_RESOLUTIONS,
+    BACKFILL_STORAGE_KEY,
+    STORAGE_VERSION,
+    UNITS_METRIC,
+    UNITS_SECTIONS,
+)
+from .observation import sensor_unit
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _to_float(value):
+    """Convert a history value to float, or None."""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HourBucket:
+    """Mean/min/max and last value of one sensor within one hour."""
+
+    __slots__ = ("total", "count", "min", "max", "last")
+
+    def __init__(self):
+        """Initialize the bucket."""
+        self.total = 0.0
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.last = None
+
+    def add(self, mean, low, high):
+        """Add one history row."""
+        if mean is None:
+            known = [value for value in (low, high) if value is not None]
+            if not known:
+                return
+            mean = sum(known) / len(known)
+        low = mean if low is None else low
+        high = mean if high is None else high
+        self.total += mean
+        self.count += 1
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        # Rows come in time order
+        self.last = mean
+
+
+def aggregate_history(payload, buckets, units=UNITS_METRIC):
+    """Reduce history rows into hourly buckets per sensor type.
+
+    buckets maps (sensor_type, hour start) to a HourBucket. Rows of the "all"
+    resolution end up several per bucket, hourly rows one each. Only sensor
+    types with long-term statistics are reduced.
+    """
+    for row in (payload or {}).get("observations") or []:
+        obs_time = row.get("obsTimeUtc")
+        if not obs_time:
+            continue
+        try:
+            start = datetime.fromisoformat(obs_time.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        start = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        section = row.get(UNITS_SECTIONS[units]) or {}
+        for sensor_type, (source, mean_key, low_key, high_key) in HISTORY_FIELDS.items():
+            if sensor_type not in SENSOR_STATE_CLASSES:
+                continue
+            source = section if source == "units" else row
+            mean = _to_float(source.get(mean_key)) if mean_key else None
+            low = _to_float(source.get(low_key)) if low_key else None
+            high = _to_float(source.get(high_key)) if high_key else None
+            if mean is None and low is None and high is None:
+                continue
+            key = (sensor_type, start)
+            if (bucket := buckets.get(key)) is None:
+                bucket = buckets[key] = HourBucket()
+            bucket.add(mean, low, high)
+
+
+def statistics_rows(statistic_ids, buckets, sums, units=UNITS_METRIC):
+    """Return (metadata, rows) to import per sensor type from hourly buckets.
+
+    Measurements become hourly mean/min/max. Total increasing sensors get
+    the state at the end of the hour and a running sum; sums maps their
+    sensor type to the last (state, sum) and carries it across batches.
+    Statistics recorded after the backfilled range are not shifted.
+    """
+    rows = {}
+    for (sensor_type, start), bucket in sorted(buckets.items(), key=lambda item: item[0][1]):
+        if sensor_type not in statistic_ids or not bucket.count:
+            continue
+        if SENSOR_STATE_CLASSES[sensor_type] == "total_increasing":
+            state, total = sums.get(sensor_type, (None, 0.0))
+            if state is not None:
+                # A lower value means the counter was reset in between
+                total += bucket.last - state if bucket.last >= state else bucket.last
+            sums[sensor_type] = (bucket.last, total)
+            row = {"start": start, "state": bucket.last, "sum": total}
+        else:
+            row = {
+                "start": start,
+                "mean": bucket.total / bucket.count,
+                "min": bucket.min,
+                "max": bucket.max,
+            }
+        rows.setdefault(sensor_type, []).append(row)
+
+    result = []
+    for sensor_type, statistics in rows.items():
+        total_increasing = SENSOR_STATE_CLASSES[sensor_type] == "total_increasing"
+        metadata = {
+            "has_mean": not total_increasing,
+            "has_sum": total_increasing,
+            "name": None,
+            "source": "recorder",
+            "statistic_id": statistic_ids[sensor_type],
+            "unit_of_measurement": sensor_unit(sensor_type, units) or None,
+        }
+        result.append((metadata, statistics))
+    return result
+
+
+class HistoryBackfill:
+    """Run and resume history backfills of configured stations.
+
+    Days are fetched a few at a time, reduced into hourly buckets and imported
+    before the next batch is fetched, so memory stays bounded for long ranges.
+    Progress is persisted after every batch.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub):
+        """Initialize the backfill manager."""
+        self.hass = hass
+        self.hub = hub
+        self._store = Store(hass, STORAGE_VERSION, BACKFILL_STORAGE_KEY)
+        self._jobs = {}
+        self._tasks = {}
+
+    async def async_load(self):
+        """Load pending jobs."""
+        jobs = (await self._store.async_load() or {}).get("jobs", {})
+        for station_id, job in list(jobs.items()):
+            if job["resolution"] not in BACKFILL_RESOLUTIONS:
+                _LOGGER.warning(
+                    "Dropping %s backfill of station %s, it can't be imported as statistics",
+                    job["resolution"],
+                    station_id,
+                )
+                del jobs[station_id]
+        self._jobs = jobs
+
+    @property
+    def stats(self):
+        """Return the number of pending and running jobs."""
+        return {"pending": len(self._jobs), "running": len(self._tasks)}
+
+    @callback
+    def async_start(self, station_id, start: date, end: date, resolution):
+        """Start (or restart) a backfill of a station."""
+        job = self._jobs.get(station_id)
+        if not (
+            job
+            and job["start"] == start.isoformat()
+            and job["end"] == end.isoformat()
+            and job["resolution"] == resolution
+        ):
+            job = self._jobs[station_id] = {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "next": start.isoformat(),
+                "resolution": resolution,
+            }
+            self._async_save()
+        else:
+            _LOGGER.info("Resuming backfill of station %s from %s", station_id, job["next"])
+        self._async_spawn(station_id)
+
+    @callback
+    def async_resume(self, station_id):
+        """Resume an interrupted backfill of a station, if any."""
+        if station_id in self._jobs:
+            self._async_spawn(station_id)
+
+    @callback
+    def async_cancel(self, station_id):
+        """Stop a running backfill, keeping its progress."""
+        if (task := self._tasks.pop(station_id, None)) is not None:
+            task.cancel()
+
+    @callback
+    def _async_spawn(self, station_id):
+        """Run the job of a station in the background."""
+        self.async_cancel(station_id)
+        self._tasks[station_id] = self.hass.async_create_background_task(
+            self._async_run(station_id), f"{DOMAIN}_backfill_{station_id}"
+        )
+
+    @callback
+    def _async_save(self):
+        """Persist job progress."""
+        self._store.async_delay_save(lambda: {"jobs": self._jobs}, 1)
+
+    async def _async_run(self, station_id):
+        """Fetch, reduce and import the remaining days of a job."""
+        job = self._jobs[station_id]
+        day = date.fromisoformat(job["next"])
+        end = date.fromisoformat(job["end"])
+        total_days = (end - date.fromisoformat(job["start"])).days + 1
+        try:
+            statistic_ids = self._statistic_ids(station_id)
+            if not statistic_ids:
+                _LOGGER.warning(
+                    "No sensors with statistics registered for station %s, dropping its backfill",
+                    station_id,
+                )
+                self._jobs.pop(station_id, None)
+                self._async_save()
+                return
+
+            while day <= end:
+                days = [
+                    day + timedelta(days=offset)
+                    for offset in range(BACKFILL_CONCURRENCY)
+                    if day + timedelta(days=offset) <= end
+                ]
+                payloads = await asyncio.gather(
+                    *(
+                        self.hub.async_fetch_history(station_id, batch_day, job["resolution"])
+                        for batch_day in days
+                    )
+                )
+                buckets = {}
+                for payload in payloads:
+                    aggregate_history(payload, buckets, self.hub.units)
+                self._async_import(statistic_ids, buckets, job)
+
+                day = days[-1] + timedelta(days=1)
+                job["next"] = day.isoformat()
+                self._async_save()
+                done = (day - date.fromisoformat(job["start"])).days
+                self.hass.bus.async_fire(
+                    BACKFILL_PROGRESS_EVENT,
+                    {"station_id": station_id, "days_done": done, "days_total": total_days},
+                )
+                _LOGGER.debug("Backfill of station %s: %d/%d days", station_id, done, total_days)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            _LOGGER.error(
+                "Backfill of station %s stopped at %s: %s", station_id, job["next"], err
+            )
+            return
+        finally:
+            if self._tasks.get(station_id) is asyncio.current_task():
+                self._tasks.pop(station_id)
+
+        _LOGGER.info("Backfill of station %s finished", station_id)
+        self._jobs.pop(station_id, None)
+        self._async_save()
+
+    def _statistic_ids(self, station_id):
+        """Return the entity ids of the station's sensors with statistics by sensor type."""
+        registry = er.async_get(self.hass)
+        statistic_ids = {}
+        for sensor_type in SENSOR_STATE_CLASSES:
+            entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{station_id}_{sensor_type}")
+            if entity_id:
+                statistic_ids[sensor_type] = entity_id
+        return statistic_ids
+
+    @callback
+    def _async_import(self, statistic_ids, buckets, job):
+        """Import one batch of hourly buckets into the recorder statistics."""
+        from homeassistant.components.recorder.statistics import async_import_statistics
+
+        for metadata, statistics in statistics_rows(
+            statistic_ids, buckets, job.setdefault("sums", {}), self.hub.units
+        ):
+            async_import_statistics(self.hass, metadata, statistics)
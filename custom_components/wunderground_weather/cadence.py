@@ -0,0 +1,76 @@
+"""Learn the upload cadence of a personal weather station."""
+import random
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from statistics import median
+
+from .const import (
+    ADAPTIVE_UPLOAD_DELAY,
+    ADAPTIVE_JITTER,
+    CADENCE_SAMPLES,
+)
+
+
+class StationCadence:
+    """Track observation times to learn a station's upload period and phase."""
+
+    def __init__(self):
+        """Initialize the cadence tracker."""
+        self.last_observation = None
+        self.polls = 0
+        self.wasted_polls = 0
+        self.backoff = 0
+        self.duplicate = False
+        self._periods = deque(maxlen=CADENCE_SAMPLES)
+
+    @property
+    def period(self):
+        """Return the learned upload period in seconds, or None."""
+        if not self._periods:
+            return None
+        return median(self._periods)
+
+    @property
+    def wasted_ratio(self):
+        """Return the share of polls that didn't bring a new observation."""
+        if not self.polls:
+            return 0.0
+        return self.wasted_polls / self.polls
+
+    def record(self, observation):
+        """Record the result of a poll and return True if it was a new observation."""
+        self.polls += 1
+        obs_time = observation.obs_time if observation else None
+        self.duplicate = obs_time is not None and obs_time == self.last_observation
+        if obs_time is None or self.duplicate:
+            self.wasted_polls += 1
+            self.backoff += 1
+            return False
+
+        if self.last_observation is not None and obs_time > self.last_observation:
+            self._periods.append((obs_time - self.last_observation).total_seconds())
+        self.last_observation = obs_time
+        self.backoff = 0
+        return True
+
+    def next_delay(self, floor, ceiling, now=None):
+        """Return seconds until the next poll should run."""
+        if self.backoff:
+            delay = floor * 2 ** (self.backoff - 1)
+            delay *= 1 + random.uniform(0, ADAPTIVE_JITTER)
+        elif self.period and self.last_observation is not None:
+            now = now or datetime.now(timezone.utc)
+            expected = self.last_observation + timedelta(seconds=self.period)
+            delay = (expected - now).total_seconds() + ADAPTIVE_UPLOAD_DELAY
+        else:
+            delay = floor
+        return min(max(delay, floor), ceiling)
+
+    def as_dict(self):
+        """Return the cadence as diagnostic attributes."""
+        return {
+            "upload_period": self.period,
+            "last_observation": self.last_observation.isoformat() if self.last_observation else None,
+            "polls": self.polls,
+            "wasted_poll_ratio": round(self.wasted_ratio, 3),
+        }
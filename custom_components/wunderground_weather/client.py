@@ -0,0 +1,52 @@
+"""Dedicated HTTP client for the Wunderground and weather.com hosts."""
+import json
+
+import aiohttp
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.util import ssl as ssl_util
+
+from .const import CONNECTION_LIMIT, DNS_CACHE_TTL, KEEPALIVE_TIMEOUT
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# aiohttp only decodes br responses if a brotli package is installed
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:  # pragma: no cover
+    HAS_BROTLI = False
+
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+def json_loads(body):
+    """Decode a JSON body straight from bytes."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+JSONDecodeError = orjson.JSONDecodeError if orjson is not None else json.JSONDecodeError
+
+
+def create_session():
+    """Create a session with persistent connections and cached DNS.
+
+    Only two hosts are polled, so a small pool kept alive between polls
+    avoids a TCP and TLS handshake on every request.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_LIMIT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ssl=ssl_util.get_default_context(),
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "User-Agent": f"HomeAssistant/{HA_VERSION} aiohttp/{aiohttp.__version__}",
+        },
+    )
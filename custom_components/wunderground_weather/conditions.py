@@ -0,0 +1,137 @@
+"""Batch classification of observations into Home Assistant conditions.
+
+NumPy is imported on first classification so loading the integration
+doesn't pay for it.
+"""
+from .const import PRESSURE_FALLING_THRESHOLD, UNITS_IMPERIAL, UNITS_METRIC
+from .observation import FIELD_INDEX
+
+# Condition codes returned by classify_conditions index this tuple
+CONDITIONS = (
+    "snowy-rainy",
+    "snowy",
+    "pouring",
+    "rainy",
+    "sunny",
+    "partlycloudy",
+    "fog",
+    "windy-variant",
+    "windy",
+    "clear-night",
+    "cloudy",
+    "exceptional",
+)
+_EXCEPTIONAL = CONDITIONS.index("exceptional")
+
+
+def _column(values):
+    """Return values as a float array with missing values (NaN) as 0."""
+    import numpy as np
+
+    return np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+
+
+def classify_conditions(
+    temp, humidity, wind_speed, precip_rate, solar_radiation, hour, pressure_change=None
+):
+    """Classify columns of observations and return an array of condition codes.
+
+    Missing values are NaN and count as 0. A NaN hour is treated as day, a NaN
+    pressure_change as an unknown tendency.
+    """
+    import numpy as np
+
+    temp = _column(temp)
+    humidity = _column(humidity)
+    wind_speed = _column(wind_speed)
+    precip_rate = _column(precip_rate)
+    solar_radiation = _column(solar_radiation)
+    hour = np.asarray(hour, dtype=float)
+
+    is_day = np.isnan(hour) | ((hour >= 6) & (hour <= 18))
+    if pressure_change is None:
+        pressure_falling = np.zeros(temp.shape, dtype=bool)
+    else:
+        pressure_falling = np.asarray(pressure_change, dtype=float) <= -PRESSURE_FALLING_THRESHOLD
+
+    raining = precip_rate > 0.0
+    freezing = temp <= 0
+    sunny = (solar_radiation > 50) & is_day
+    windy = wind_speed > 20
+
+    # First matching rule wins, in the same order as the scalar rules
+    rules = [
+        (raining & freezing & (precip_rate > 0.1), "snowy-rainy"),
+        (raining & freezing, "snowy"),
+        (raining & (precip_rate > 5.0), "pouring"),
+        (raining, "rainy"),
+        (sunny & (humidity < 70) & ~pressure_falling, "sunny"),
+        (sunny, "partlycloudy"),
+        ((humidity >= 95) & (solar_radiation < 10), "fog"),
+        (windy & (solar_radiation < 50), "windy-variant"),
+        (windy, "windy"),
+        ((solar_radiation < 10) & ~is_day, "clear-night"),
+        (solar_radiation < 50, "cloudy"),
+    ]
+    return np.select(
+        [mask for mask, _ in rules],
+        [CONDITIONS.index(condition) for _, condition in rules],
+        default=_EXCEPTIONAL,
+    ).astype(np.uint8)
+
+
+def classify_observations(observations, pressure_changes=None, units=UNITS_METRIC):
+    """Classify a sequence of Observation objects and return condition codes.
+
+    Observations in imperial units are converted to metric column-wise, as
+    the rules use metric thresholds. All values of a malformed observation
+    count as 0, like in the scalar rules.
+    """
+    import numpy as np
+
+    count = len(observations)
+    columns = {
+        sensor_type: np.fromiter(
+            (
+                np.nan if (value := observation.values[FIELD_INDEX[sensor_type]]) is None else value
+                for observation in observations
+            ),
+            dtype=float,
+            count=count,
+        )
+        for sensor_type in ("temperature", "humidity", "wind_speed", "precip_rate", "solar_radiation")
+    }
+    hours = np.fromiter(
+        (
+            np.nan if observation.local_hour is None else observation.local_hour
+            for observation in observations
+        ),
+        dtype=float,
+        count=count,
+    )
+    if pressure_changes is not None:
+        pressure_changes = np.array(
+            [np.nan if change is None else change for change in pressure_changes], dtype=float
+        )
+    if units == UNITS_IMPERIAL:
+        columns["temperature"] = (columns["temperature"] - 32) * 5 / 9
+        columns["wind_speed"] *= 1.609344
+        columns["precip_rate"] *= 25.4
+        if pressure_changes is not None:
+            pressure_changes *= 33.8639
+    # Zeroed after the conversion, the scalar rules read metric values
+    malformed = np.fromiter(
+        (observation.malformed for observation in observations), dtype=bool, count=count
+    )
+    if malformed.any():
+        for values in columns.values():
+            values[malformed] = 0.0
+    return classify_conditions(
+        columns["temperature"],
+        columns["humidity"],
+        columns["wind_speed"],
+        columns["precip_rate"],
+        columns["solar_radiation"],
+        hours,
+        pressure_changes,
+    )
@@ -1,4 +1,11 @@
 from homeassistant import config_entries
+from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.selector import (
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 import voluptuous as vol
 from .const import (
     DOMAIN,
@@ -6,7 +13,27 @@ from .const import (
     CONF_STATION_ID,
     CONF_UPDATE_INTERVAL,
     CONF_STATION_NAME,
+    CONF_POLLING_MODE,
+    DEFAULT_POLLING_MODE,
+    POLLING_MODE_FIXED,
+    POLLING_MODE_ADAPTIVE,
+    CONF_MAX_STALE_AGE,
+    DEFAULT_MAX_STALE_AGE,
+    CONF_PUSH_ENABLED,
+    CONF_PUSH_FORWARD,
+    CONF_PUSH_PASSWORD,
+    CONF_BACKUP_STATIONS,
+    CONF_ARCHIVE_ENABLED,
+    CONF_SENSOR_TYPES,
+    SENSOR_TYPES,
+    CONF_DEADBAND_PREFIX,
+    CONF_DEADBAND_RELATIVE,
+    CONF_HEARTBEAT,
+    DEFAULT_DEADBAND_RELATIVE,
+    DEFAULT_HEARTBEAT,
 )
+from .hub import api_units
+from .observation import default_deadband
 
 
 class WundergroundWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -62,23 +89,108 @@ class WundergroundWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Import config from configuration.yaml."""
         return await self.async_step_user(import_data)
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow handler."""
+        return WundergroundWeatherOptionsFlow(config_entry)
+
+
+class WundergroundWeatherOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Wunderground Weather."""
+
+    def __init__(self, config_entry):
+        """Initialize the options flow."""
+        self._config_entry = config_entry
+        self._options = dict(config_entry.options)
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        return await self.async_step_options(user_input)
+
     async def async_step_options(self, user_input=None):
         """Handle options updates."""
+        errors = {}
+
         if user_input is not None:
-            return self.async_create_entry(
-                title=self.config_entry.title,
-                data=self.config_entry.data,
-                options=user_input,
-            )
-            
+            if user_input[CONF_PUSH_ENABLED] and not user_input.get(CONF_PUSH_PASSWORD):
+                errors[CONF_PUSH_PASSWORD] = "push_password_required"
+            else:
+                self._options.update(user_input)
+                return await self.async_step_deadbands()
+
+        options = self._config_entry.options
         return self.async_show_form(
             step_id="options",
             data_schema=vol.Schema(
                 {
                     vol.Required(
                         CONF_UPDATE_INTERVAL,
-                        default=self.config_entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+                        default=options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
                     ): vol.All(vol.Coerce(int), vol.Range(min=30, max=3600)),
+                    vol.Required(
+                        CONF_POLLING_MODE,
+                        default=options.get(CONF_POLLING_MODE, DEFAULT_POLLING_MODE)
+                    ): vol.In([POLLING_MODE_FIXED, POLLING_MODE_ADAPTIVE]),
+                    vol.Required(
+                        CONF_MAX_STALE_AGE,
+                        default=options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                    vol.Required(
+                        CONF_PUSH_ENABLED,
+                        default=options.get(CONF_PUSH_ENABLED, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_PUSH_PASSWORD,
+                        default=options.get(CONF_PUSH_PASSWORD, "")
+                    ): TextSelector(TextSelectorConfig(type=TextSelectorType.PASSWORD)),
+                    vol.Required(
+                        CONF_PUSH_FORWARD,
+                        default=options.get(CONF_PUSH_FORWARD, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_BACKUP_STATIONS,
+                        default=options.get(CONF_BACKUP_STATIONS, "")
+                    ): str,
+                    vol.Required(
+                        CONF_ARCHIVE_ENABLED,
+                        default=options.get(CONF_ARCHIVE_ENABLED, False)
+                    ): bool,
+                    vol.Required(
+                        CONF_SENSOR_TYPES,
+                        default=options.get(CONF_SENSOR_TYPES, list(SENSOR_TYPES))
+                    ): cv.multi_select(
+                        {sensor_type: name for sensor_type, (name, _, _) in SENSOR_TYPES.items()}
+                    ),
                 }
             ),
+            errors=errors,
         )
+
+    async def async_step_deadbands(self, user_input=None):
+        """Handle the per-sensor deadbands and heartbeat."""
+        if user_input is not None:
+            self._options.update(user_input)
+            return self.async_create_entry(title="", data=self._options)
+
+        options = self._options
+        units = api_units(self.hass)
+        schema = {}
+        for sensor_type in SENSOR_TYPES:
+            if sensor_type not in options.get(CONF_SENSOR_TYPES, SENSOR_TYPES):
+                continue
+            key = f"{CONF_DEADBAND_PREFIX}{sensor_type}"
+            schema[
+                vol.Required(key, default=options.get(key, default_deadband(sensor_type, units)))
+            ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        schema[
+            vol.Required(
+                CONF_DEADBAND_RELATIVE,
+                default=options.get(CONF_DEADBAND_RELATIVE, DEFAULT_DEADBAND_RELATIVE)
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0, max=100))
+        schema[
+            vol.Required(CONF_HEARTBEAT, default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT))
+        ] = vol.All(vol.Coerce(int), vol.Range(min=60, max=86400))
+
+        return self.async_show_form(step_id="deadbands", data_schema=vol.Schema(schema))
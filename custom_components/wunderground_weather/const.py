@@ -4,6 +4,107 @@ CONF_STATION_ID = "station_id"
 CONF_UPDATE_INTERVAL = "update_interval"
 CONF_STATION_NAME = "station_name"
 
+# Upstream hosts; kept in one place so they can be pointed at a local stand-in
+DASHBOARD_URL = "https://www.wunderground.com/dashboard/pws/{station_id}"
+OBSERVATIONS_URL = "https://api.weather.com/v2/pws/observations/current"
+HISTORY_URL = "https://api.weather.com/v2/pws/history/{resolution}"
+FORECAST_URLS = {
+    "daily": "https://api.weather.com/v3/wx/forecast/daily/5day",
+    "hourly": "https://api.weather.com/v3/wx/forecast/hourly/2day",
+}
+
+# Scraped SUN_API_KEY is shared by all stations and re-used until it expires
+# or the API rejects it
+DEFAULT_API_KEY_TTL = 24 * 60 * 60
+
+# All stations are polled by one hub per Home Assistant instance
+DATA_HUB = "hub"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+DEFAULT_MAX_CONCURRENCY = 4
+HUB_TICK_INTERVAL = 5
+
+# Last good observation and API key are persisted across restarts and served
+# while polls fail, up to a maximum age
+STORAGE_KEY = "wunderground_weather.snapshot"
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+CONF_MAX_STALE_AGE = "max_stale_age"
+DEFAULT_MAX_STALE_AGE = 3600
+
+# Local push of the PWS upload protocol; polling resumes when pushes stop
+CONF_PUSH_ENABLED = "push_enabled"
+CONF_PUSH_FORWARD = "push_forward"
+# Uploads must carry the station key as PASSWORD
+CONF_PUSH_PASSWORD = "push_password"
+PUSH_URL = "/weatherstation/updateweatherstation.php"
+PUSH_FORWARD_URL = "https://rtupdate.wunderground.com/weatherstation/updateweatherstation.php"
+PUSH_TIMEOUT = 5 * 60
+
+# Forecasts are cached per location and refreshed on their own schedule
+FORECAST_TTL = 30 * 60
+FORECAST_UPDATE_INTERVAL = 30 * 60
+FORECAST_LOCATION_PRECISION = 2
+
+# History backfill into long-term statistics
+SERVICE_BACKFILL = "backfill"
+BACKFILL_STORAGE_KEY = "wunderground_weather.backfill"
+BACKFILL_PROGRESS_EVENT = "wunderground_weather_backfill_progress"
+# Backfill fetches have their own slots, below the default max_concurrency,
+# and leave a share of the request budget to the regular polls
+BACKFILL_CONCURRENCY = 2
+BACKFILL_BUDGET_RESERVE = 0.5
+# Daily rows summarize a whole day and can't be imported as hourly statistics
+BACKFILL_RESOLUTIONS = ["hourly", "all"]
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_RESOLUTION = "resolution"
+
+# Shared request budget, timeouts and circuit breaker for upstream hosts
+CONF_REQUEST_BUDGET = "requests_per_minute"
+DEFAULT_REQUEST_BUDGET = 120
+MAX_BUDGET_WAIT = 30
+REQUEST_CONNECT_TIMEOUT = 10
+REQUEST_READ_TIMEOUT = 20
+REQUEST_TOTAL_TIMEOUT = 30
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 120
+# Endpoints with a breaker of their own, so failing forecasts or history
+# requests don't stop the observation polls on the same host
+BREAKER_ENDPOINTS = ("/v2/pws/observations", "/v2/pws/history", "/v3/wx/forecast")
+
+# Dedicated connection pool
+CONNECTION_LIMIT = 16
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+# Backup stations: a hedged request goes to the next station when the current
+# one hasn't answered within its p95 latency or returned a stale observation
+CONF_BACKUP_STATIONS = "backup_stations"
+HEDGE_MIN_DELAY = 2
+STATION_STALE_AGE = 30 * 60
+
+# Optional observation archive
+CONF_ARCHIVE_ENABLED = "archive_enabled"
+ARCHIVE_DIRECTORY = "wunderground_weather_archive"
+ARCHIVE_BATCH_SIZE = 256
+ARCHIVE_FLUSH_DELAY = 5 * 60
+ARCHIVE_MAX_FILE_SIZE = 8 * 1024 * 1024
+# Rows kept per station for the next flush when writing them fails
+ARCHIVE_MAX_RETAINED = 4 * ARCHIVE_BATCH_SIZE
+
+# Polling modes
+CONF_POLLING_MODE = "polling_mode"
+POLLING_MODE_FIXED = "fixed"
+POLLING_MODE_ADAPTIVE = "adaptive"
+DEFAULT_POLLING_MODE = POLLING_MODE_FIXED
+
+# Adaptive polling: poll shortly after the expected upload, never more often
+# than the configured interval and never less often than the maximum
+ADAPTIVE_UPLOAD_DELAY = 10
+ADAPTIVE_MAX_INTERVAL = 3600
+ADAPTIVE_JITTER = 0.2
+CADENCE_SAMPLES = 16
+
 # Sensor definitions
 SENSOR_TYPES = {
     "temperature": ["Temperature", "°C", "mdi:thermometer"],
@@ -17,4 +118,165 @@ SENSOR_TYPES = {
     "uv": ["UV Index", "", "mdi:weather-sunny"],
     "precip_rate": ["Precipitation Rate", "mm/h", "mdi:water"],
     "precip_total": ["Precipitation Total", "mm", "mdi:water"],
-}
\ No newline at end of file
+}
+
+# State class of the sensors with long-term statistics; only these are backfilled
+SENSOR_STATE_CLASSES = {
+    "temperature": "measurement",
+    "humidity": "measurement",
+    "pressure": "measurement",
+    # Accumulated since local midnight, the reset is detected by the recorder
+    "precip_total": "total_increasing",
+}
+
+# Sensor types created per entry; the weather entity needs some of them
+# decoded even when their sensors are not created
+CONF_SENSOR_TYPES = "sensor_types"
+WEATHER_FIELDS = (
+    "temperature",
+    "humidity",
+    "pressure",
+    "wind_speed",
+    "wind_gust",
+    "wind_bearing",
+    "precip_rate",
+    "solar_radiation",
+)
+
+# API units parameter, following the Home Assistant unit system, and the
+# payload section holding the values that depend on it
+UNITS_METRIC = "m"
+UNITS_IMPERIAL = "e"
+UNITS_SECTIONS = {UNITS_METRIC: "metric", UNITS_IMPERIAL: "imperial"}
+# Units of the sensor types that differ from SENSOR_TYPES with imperial units
+IMPERIAL_SENSOR_UNITS = {
+    "temperature": "°F",
+    "pressure": "inHg",
+    "wind_speed": "mph",
+    "wind_gust": "mph",
+    "dew_point": "°F",
+    "precip_rate": "in/h",
+    "precip_total": "in",
+}
+
+# Diagnostic sensors, disabled by default
+DIAGNOSTIC_SENSOR_TYPES = {
+    "poll_duration": ["Poll Duration", "ms", "mdi:timer-outline"],
+    "sync_time": ["Parse Time", "ms", "mdi:timer-cog-outline"],
+    "bytes_received": ["Bytes Received", "B", "mdi:download-network"],
+}
+STATS_WINDOW = 100
+# Allocation sites listed in the diagnostics while tracemalloc is tracing
+ALLOCATION_SITES = 15
+
+# Rolling-window trends kept per station
+TREND_CAPACITY = 2048
+TREND_WINDOWS = {"10m": 600, "1h": 3600, "3h": 3 * 3600, "24h": 24 * 3600}
+TREND_FIELDS = ("temperature", "pressure", "wind_gust", "precip_rate")
+# Pressure falling at least this much over 3 h makes a sunny sky "partlycloudy"
+PRESSURE_FALLING_THRESHOLD = 2.0
+
+# Location of each sensor value in the observations/current payload; "units"
+# values are in the section of the requested units ("metric" or "imperial")
+SENSOR_FIELDS = {
+    "temperature": ("units", "temp"),
+    "humidity": ("observation", "humidity"),
+    "pressure": ("units", "pressure"),
+    "wind_speed": ("units", "windSpeed"),
+    "wind_gust": ("units", "windGust"),
+    "wind_bearing": ("observation", "winddir"),
+    "dew_point": ("units", "dewpt"),
+    "solar_radiation": ("observation", "solarRadiation"),
+    "uv": ("observation", "uv"),
+    "precip_rate": ("units", "precipRate"),
+    "precip_total": ("units", "precipTotal"),
+}
+
+# Sensors only write a new state when the value moves by more than its
+# deadband, or when the heartbeat expires
+CONF_DEADBAND_PREFIX = "deadband_"
+CONF_DEADBAND_RELATIVE = "deadband_relative"
+CONF_HEARTBEAT = "heartbeat"
+DEFAULT_DEADBAND_RELATIVE = 0
+DEFAULT_HEARTBEAT = 3600
+DEFAULT_SENSOR_DEADBANDS = {
+    "temperature": 0,
+    "humidity": 0,
+    "pressure": 0.1,
+    "wind_speed": 0,
+    "wind_gust": 0,
+    "wind_bearing": 5,
+    "dew_point": 0,
+    "solar_radiation": 1,
+    "uv": 0,
+    "precip_rate": 0,
+    "precip_total": 0,
+}
+IMPERIAL_SENSOR_DEADBANDS = {**DEFAULT_SENSOR_DEADBANDS, "pressure": 0.003}
+
+# Location of (mean, low, high) of each sensor in PWS history rows
+HISTORY_FIELDS = {
+    "temperature": ("units", "tempAvg", "tempLow", "tempHigh"),
+    "humidity": ("observation", "humidityAvg", "humidityLow", "humidityHigh"),
+    "pressure": ("units", None, "pressureMin", "pressureMax"),
+    "wind_speed": ("units", "windspeedAvg", "windspeedLow", "windspeedHigh"),
+    "wind_gust": ("units", "windgustAvg", "windgustLow", "windgustHigh"),
+    "wind_bearing": ("observation", "winddirAvg", None, None),
+    "dew_point": ("units", "dewptAvg", "dewptLow", "dewptHigh"),
+    "solar_radiation": ("observation", None, None, "solarRadiationHigh"),
+    "uv": ("observation", None, None, "uvHigh"),
+    "precip_rate": ("units", "precipRate", None, None),
+    "precip_total": ("units", "precipTotal", None, None),
+}
+
+# Home Assistant condition of each weather.com forecast icon code
+FORECAST_ICON_CONDITIONS = (
+    "exceptional",  # 0 tornado
+    "exceptional",  # 1 tropical storm
+    "exceptional",  # 2 hurricane
+    "lightning-rainy",  # 3 strong storms
+    "lightning-rainy",  # 4 thunderstorms
+    "snowy-rainy",  # 5 rain and snow
+    "snowy-rainy",  # 6 rain and sleet
+    "snowy-rainy",  # 7 wintry mix
+    "snowy-rainy",  # 8 freezing drizzle
+    "rainy",  # 9 drizzle
+    "snowy-rainy",  # 10 freezing rain
+    "rainy",  # 11 showers
+    "rainy",  # 12 rain
+    "snowy",  # 13 flurries
+    "snowy",  # 14 snow showers
+    "snowy",  # 15 blowing snow
+    "snowy",  # 16 snow
+    "hail",  # 17 hail
+    "snowy-rainy",  # 18 sleet
+    "exceptional",  # 19 dust
+    "fog",  # 20 fog
+    "fog",  # 21 haze
+    "fog",  # 22 smoke
+    "windy",  # 23 breezy
+    "windy",  # 24 windy
+    "exceptional",  # 25 frigid
+    "cloudy",  # 26 cloudy
+    "cloudy",  # 27 mostly cloudy (night)
+    "cloudy",  # 28 mostly cloudy (day)
+    "partlycloudy",  # 29 partly cloudy (night)
+    "partlycloudy",  # 30 partly cloudy (day)
+    "clear-night",  # 31 clear (night)
+    "sunny",  # 32 sunny
+    "clear-night",  # 33 fair (night)
+    "sunny",  # 34 fair (day)
+    "hail",  # 35 rain and hail
+    "sunny",  # 36 hot
+    "lightning-rainy",  # 37 isolated thunderstorms
+    "lightning-rainy",  # 38 scattered thunderstorms
+    "rainy",  # 39 scattered showers (day)
+    "pouring",  # 40 heavy rain
+    "snowy",  # 41 scattered snow showers (day)
+    "snowy",  # 42 heavy snow
+    "snowy",  # 43 blizzard
+    None,  # 44 not available
+    "rainy",  # 45 scattered showers (night)
+    "snowy",  # 46 scattered snow showers (night)
+    "lightning-rainy",  # 47 scattered thunderstorms (night)
+)
@@ -0,0 +1,251 @@
+"""Data update coordinator for a single Wunderground station."""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .cadence import StationCadence
+from .const import (
+    CONF_ARCHIVE_ENABLED,
+    CONF_BACKUP_STATIONS,
+    CONF_MAX_STALE_AGE,
+    DEFAULT_MAX_STALE_AGE,
+    HEDGE_MIN_DELAY,
+    CONF_SENSOR_TYPES,
+    PUSH_TIMEOUT,
+    SENSOR_TYPES,
+    STATION_STALE_AGE,
+    WEATHER_FIELDS,
+)
+from .observation import decode_observation
+from .stats import StationStats
+from .trends import StationTrends
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_station_ids(value):
+    """Split a comma or whitespace separated list of station IDs."""
+    return [station_id.upper() for station_id in value.replace(",", " ").split()]
+
+
+class WundergroundCoordinator(DataUpdateCoordinator):
+    """Coordinator for one station, refreshed by the shared hub."""
+
+    def __init__(self, hass: HomeAssistant, hub, station_id: str):
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"wunderground_weather_{station_id}",
+            update_interval=None,
+            # Listeners are only notified when the returned data changes
+            always_update=False,
+        )
+        self.hub = hub
+        self.station_id = station_id
+        # Sensor types with entities; changing them reloads the entry
+        self.sensor_types = frozenset(
+            self.config_entry.options.get(CONF_SENSOR_TYPES, SENSOR_TYPES)
+            if self.config_entry is not None
+            else SENSOR_TYPES
+        )
+        self.decoded_fields = self.sensor_types | frozenset(WEATHER_FIELDS)
+        self.cadence = StationCadence()
+        self.suppressed_updates = 0
+        self.stats = StationStats()
+        # Backup fetches are timed apart, the hedge delay is the primary's p95
+        self.backup_stats = StationStats()
+        self.trends = StationTrends()
+        # True while serving a restored snapshot or the last good data after a failure
+        self.stale = False
+        self.last_push = None
+        self.pushes = 0
+        # Station that served the current data, and how often backups were asked
+        self.source_station = station_id
+        self.hedged_requests = 0
+        self.failovers = 0
+
+    @property
+    def observation_age(self):
+        """Return the age of the current observation in seconds, or None."""
+        if self.data is None or self.data.obs_time is None:
+            return None
+        return (datetime.now(timezone.utc) - self.data.obs_time).total_seconds()
+
+    @property
+    def backup_stations(self):
+        """Return the configured backup station IDs in order."""
+        if self.config_entry is None:
+            return []
+        value = self.config_entry.options.get(CONF_BACKUP_STATIONS, "")
+        return [
+            station_id
+            for station_id in parse_station_ids(value)
+            if station_id != self.station_id
+        ]
+
+    @property
+    def push_active(self):
+        """Return True while local pushes keep arriving."""
+        return self.last_push is not None and time.monotonic() - self.last_push < PUSH_TIMEOUT
+
+    @callback
+    def async_push(self, observation):
+        """Accept an observation pushed by the station itself."""
+        self.last_push = time.monotonic()
+        self.pushes += 1
+        self.source_station = self.station_id
+        data = self._accept(observation)
+        if data is not self.data:
+            self.async_set_updated_data(data)
+
+    def restore(self, observation):
+        """Serve a snapshot observation until the first poll succeeds."""
+        self.data = observation
+        self.stale = True
+        self.cadence.last_observation = observation.obs_time
+        self.trends.add(observation)
+
+    async def _async_update_data(self):
+        """Fetch the latest observation through the hub and decode it once."""
+        try:
+            with self.stats.time("total"):
+                station_id, data = await self._async_fetch_hedged()
+        except UpdateFailed as err:
+            self.cadence.record(None)
+            return self._serve_stale(err)
+        finally:
+            self.stats.end_poll()
+
+        if station_id != self.source_station:
+            _LOGGER.info("Station %s now served by %s", self.station_id, station_id)
+            if station_id != self.station_id:
+                self.failovers += 1
+        self.source_station = station_id
+        return self._accept(data)
+
+    async def _async_fetch_hedged(self):
+        """Fetch the primary station, falling back to the backup stations.
+
+        The next station is asked once the pending ones haven't answered within
+        the primary's p95 latency, or right away when a station fails or its
+        observation is stale. The first fresh observation wins and the other
+        requests are cancelled; without one the newest stale observation is used.
+        """
+        backups = self.backup_stations
+        hedge_delay = max(self.stats.p95("primary") or 0, HEDGE_MIN_DELAY)
+        pending = {}
+        fallback = None
+        error = None
+
+        def start(station_id):
+            task = asyncio.ensure_future(self._async_fetch_station(station_id))
+            pending[task] = station_id
+
+        start(self.station_id)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if backups else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    station_id = pending.pop(task)
+                    try:
+                        data = task.result()
+                    except UpdateFailed as err:
+                        error = error or err
+                        continue
+                    if not self._is_stale(data):
+                        return station_id, data
+                    if fallback is None or _newer(data, fallback[1]):
+                        fallback = (station_id, data)
+                if backups:
+                    self.hedged_requests += 1
+                    start(backups.pop(0))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if fallback is not None:
+            return fallback
+        raise error
+
+    async def _async_fetch_station(self, station_id):
+        """Fetch and decode the observation of one station."""
+        own = station_id == self.station_id
+        stats = self.stats if own else self.backup_stats
+        start = time.monotonic()
+        payload = await self.hub.async_fetch(station_id, stats)
+        if own:
+            stats.add("primary", time.monotonic() - start)
+        with stats.time("decode", sync=True):
+            data = decode_observation(payload, self.hub.units, self.decoded_fields)
+        if data is None:
+            raise UpdateFailed(f"No observation returned for station {station_id}")
+        return data
+
+    @staticmethod
+    def _is_stale(data):
+        """Return True if an observation is too old to be current."""
+        if data.obs_time is None:
+            return False
+        age = (datetime.now(timezone.utc) - data.obs_time).total_seconds()
+        return age > STATION_STALE_AGE
+
+    def _accept(self, data):
+        """Record a new observation and return the data to serve.
+
+        Observations of a backup station are served but don't feed the
+        cadence, snapshot, archive or trends of this station.
+        """
+        own = self.source_station == self.station_id
+        if own:
+            self.cadence.record(data)
+        was_stale, self.stale = self.stale, False
+        if self.data is not None and (
+            (own and self.cadence.duplicate) or data == self.data
+        ):
+            # Same observation as last poll; returning the current data keeps
+            # entities from writing an identical state
+            self.suppressed_updates += 1
+            if was_stale:
+                # Data is unchanged but no longer stale
+                self.async_update_listeners()
+            return self.data
+
+        if not own:
+            return data
+        self.hub.async_store_observation(self.station_id, data)
+        if self.config_entry is not None and self.config_entry.options.get(CONF_ARCHIVE_ENABLED):
+            self.hub.archive.async_add(self.station_id, data)
+        self.trends.add(data)
+        return data
+
+    def _serve_stale(self, err):
+        """Keep serving the last good observation until it exceeds the max age."""
+        max_age = DEFAULT_MAX_STALE_AGE
+        if self.config_entry is not None:
+            max_age = self.config_entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+        age = self.observation_age
+        if age is None or age > max_age:
+            raise err
+
+        _LOGGER.warning("%s; serving last observation (%d s old)", err, age)
+        if not self.stale:
+            self.stale = True
+            # Data is unchanged, so listeners wouldn't be notified otherwise
+            self.async_update_listeners()
+        return self.data
+
+
+def _newer(observation, other):
+    """Return True if observation is newer than other."""
+    if observation.obs_time is None:
+        return False
+    return other.obs_time is None or observation.obs_time > other.obs_time
@@ -0,0 +1,63 @@
+"""Diagnostics support for Wunderground Weather."""
+import os
+import tracemalloc
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import ALLOCATION_SITES, CONF_PUSH_PASSWORD, DOMAIN
+
+TO_REDACT = {CONF_PUSH_PASSWORD}
+
+
+def _allocation_sites():
+    """Return the top allocation sites of this integration, or None if not tracing.
+
+    Tracing can be started with the profiler integration's memory services.
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, f"*{os.sep}{DOMAIN}{os.sep}*")]
+    )
+    return [
+        {"site": str(stat.traceback), "size_kib": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:ALLOCATION_SITES]
+    ]
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    hub = coordinator.hub
+
+    return {
+        "station_id": coordinator.station_id,
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "stale": coordinator.stale,
+        "observation_age": coordinator.observation_age,
+        "suppressed_updates": coordinator.suppressed_updates,
+        "push": {"active": coordinator.push_active, "received": coordinator.pushes},
+        "failover": {
+            "backup_stations": coordinator.backup_stations,
+            "source_station": coordinator.source_station,
+            "hedged_requests": coordinator.hedged_requests,
+            "failovers": coordinator.failovers,
+            "timings": coordinator.backup_stats.as_dict(),
+        },
+        "cadence": coordinator.cadence.as_dict(),
+        "timings": coordinator.stats.as_dict(),
+        "hub": {
+            "stations": hub.station_count,
+            "max_concurrency": hub.max_concurrency,
+            "key_cache": hub.key_cache.stats,
+            "requests": hub.flights.stats,
+            "upstream": hub.session.as_dict(),
+            "archive": hub.archive.as_dict(),
+            "loop_lag": hub.loop_lag.as_dict(),
+            "footprint": hub.footprint(),
+        },
+        "allocations": await hass.async_add_executor_job(_allocation_sites),
+    }
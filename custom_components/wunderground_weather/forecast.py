@@ -0,0 +1,155 @@
+"""Forecasts for a station location, cached separately from the observation poll."""
+import logging
+import time
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    FORECAST_ICON_CONDITIONS,
+    FORECAST_LOCATION_PRECISION,
+    FORECAST_TTL,
+    FORECAST_URLS,
+    UNITS_METRIC,
+)
+from .singleflight import SingleFlight
+from .stats import StationStats
+from .api import async_get_json, async_with_api_key
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _at(values, index):
+    """Return values[index], or None if missing."""
+    if not values or index >= len(values):
+        return None
+    return values[index]
+
+
+def _condition(icon_code):
+    """Map a weather.com icon code to a Home Assistant condition."""
+    if icon_code is None or not 0 <= icon_code < len(FORECAST_ICON_CONDITIONS):
+        return None
+    return FORECAST_ICON_CONDITIONS[icon_code]
+
+
+def _timestamp(value):
+    """Return an ISO datetime for an epoch timestamp."""
+    return dt_util.utc_from_timestamp(value).isoformat()
+
+
+def parse_daily_forecast(payload):
+    """Convert a 5-day forecast payload into Home Assistant forecasts."""
+    forecasts = []
+    dayparts = (payload.get("daypart") or [{}])[0] or {}
+    for index, valid_time in enumerate(payload.get("validTimeUtc") or []):
+        # Each day has a day and a night part; the day part is gone late in the day
+        part = 2 * index
+        if _at(dayparts.get("iconCode"), part) is None:
+            part += 1
+        temperature = _at(payload.get("temperatureMax"), index)
+        if temperature is None:
+            temperature = _at(dayparts.get("temperature"), part)
+        forecasts.append(
+            {
+                "datetime": _timestamp(valid_time),
+                "condition": _condition(_at(dayparts.get("iconCode"), part)),
+                "native_temperature": temperature,
+                "native_templow": _at(payload.get("temperatureMin"), index),
+                "native_precipitation": _at(payload.get("qpf"), index),
+                "precipitation_probability": _at(dayparts.get("precipChance"), part),
+                "native_wind_speed": _at(dayparts.get("windSpeed"), part),
+                "wind_bearing": _at(dayparts.get("windDirection"), part),
+                "humidity": _at(dayparts.get("relativeHumidity"), part),
+            }
+        )
+    return forecasts
+
+
+def parse_hourly_forecast(payload):
+    """Convert a 2-day hourly forecast payload into Home Assistant forecasts."""
+    forecasts = []
+    for index, valid_time in enumerate(payload.get("validTimeUtc") or []):
+        forecasts.append(
+            {
+                "datetime": _timestamp(valid_time),
+                "condition": _condition(_at(payload.get("iconCode"), index)),
+                "native_temperature": _at(payload.get("temperature"), index),
+                "native_precipitation": _at(payload.get("qpf"), index),
+                "precipitation_probability": _at(payload.get("precipChance"), index),
+                "native_wind_speed": _at(payload.get("windSpeed"), index),
+                "wind_bearing": _at(payload.get("windDirection"), index),
+                "humidity": _at(payload.get("relativeHumidity"), index),
+                "native_pressure": _at(payload.get("pressureMeanSeaLevel"), index),
+                "is_daytime": _at(payload.get("dayOrNight"), index) == "D",
+            }
+        )
+    return forecasts
+
+
+FORECAST_PARSERS = {
+    "daily": parse_daily_forecast,
+    "hourly": parse_hourly_forecast,
+}
+
+
+class ForecastCache:
+    """TTL cache of forecasts keyed by kind and rounded location.
+
+    Concurrent callers for the same key share one request in flight. Fetches
+    don't go through the hub's poll semaphore, and failures only fall back to
+    the previously cached forecast.
+    """
+
+    def __init__(self, session, key_cache, units=UNITS_METRIC, ttl=FORECAST_TTL):
+        """Initialize the cache."""
+        self._session = session
+        self._units = units
+        self._key_cache = key_cache
+        self._ttl = ttl
+        self._entries = {}
+        self._flights = SingleFlight()
+        self.stats = StationStats()
+
+    def __len__(self):
+        """Return the number of cached forecasts."""
+        return len(self._entries)
+
+    async def async_get(self, kind, station_id, latitude, longitude):
+        """Return the forecast of a location, fetching it if expired."""
+        key = (
+            kind,
+            round(latitude, FORECAST_LOCATION_PRECISION),
+            round(longitude, FORECAST_LOCATION_PRECISION),
+        )
+        cached = self._entries.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+
+        try:
+            return await self._flights.async_do(
+                key, lambda: self._async_fetch(kind, station_id, key)
+            )
+        except Exception as err:
+            _LOGGER.warning("Error fetching %s forecast for station %s: %s", kind, station_id, err)
+            return cached[1] if cached is not None else None
+
+    async def _async_fetch(self, kind, station_id, key):
+        """Fetch and parse a forecast and store it in the cache."""
+        _, latitude, longitude = key
+
+        async def request(api_key):
+            params = {
+                "apiKey": api_key,
+                "geocode": f"{latitude},{longitude}",
+                "format": "json",
+                "units": self._units,
+                "language": "en-US",
+            }
+            return await async_get_json(self._session, FORECAST_URLS[kind], params, self.stats)
+
+        payload = await async_with_api_key(
+            self._session, station_id, self._key_cache, self.stats, request
+        )
+        forecasts = FORECAST_PARSERS[kind](payload or {})
+        self._entries[key] = (time.monotonic() + self._ttl, forecasts)
+        return forecasts
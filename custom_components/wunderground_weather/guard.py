@@ -0,0 +1,256 @@
+"""Request budget, timeouts and circuit breakers for upstream requests."""
+import asyncio
+import logging
+import time
+
+import aiohttp
+from yarl import URL
+
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_ENDPOINTS,
+    BREAKER_THRESHOLD,
+    DEFAULT_REQUEST_BUDGET,
+    MAX_BUDGET_WAIT,
+    REQUEST_CONNECT_TIMEOUT,
+    REQUEST_READ_TIMEOUT,
+    REQUEST_TOTAL_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised when requests to a host or endpoint are short-circuited."""
+
+
+class BudgetExceededError(aiohttp.ClientError):
+    """Raised when the request budget can't be met in time."""
+
+
+class TokenBucket:
+    """Token bucket allowing a number of requests per minute."""
+
+    def __init__(self, per_minute):
+        """Initialize the bucket."""
+        self.capacity = per_minute
+        self._rate = per_minute / 60
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self.acquired = 0
+        self.waited = 0.0
+        self.rejected = 0
+
+    def _refill(self):
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def async_acquire(self):
+        """Take a token, waiting up to MAX_BUDGET_WAIT for one.
+
+        The token is reserved before waiting, so the tokens can go negative
+        and every later caller's wait includes the callers queued before it.
+        """
+        self._refill()
+        wait = max((1 - self._tokens) / self._rate, 0.0)
+        if wait > MAX_BUDGET_WAIT:
+            self.rejected += 1
+            raise BudgetExceededError(f"Request budget exhausted for {wait:.0f} s")
+        self._tokens -= 1
+        self.acquired += 1
+        if wait:
+            self.waited += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the reservation back
+                self._tokens += 1
+                self.acquired -= 1
+                raise
+
+    async def async_wait_for(self, tokens):
+        """Wait until at least tokens are available, without taking any."""
+        self._refill()
+        while self._tokens < tokens:
+            await asyncio.sleep((tokens - self._tokens) / self._rate)
+            self._refill()
+
+    def as_dict(self):
+        """Return the budget usage."""
+        self._refill()
+        return {
+            "per_minute": self.capacity,
+            "available": round(max(self._tokens, 0.0), 1),
+            "acquired": self.acquired,
+            "waited_s": round(self.waited, 1),
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """Fail fast for a cool-down period after consecutive failures of a host or endpoint."""
+
+    def __init__(self, name):
+        """Initialize the breaker."""
+        self.name = name
+        self.failures = 0
+        self.opened_until = 0.0
+        self.trips = 0
+        self.short_circuited = 0
+        self._trial = False
+
+    @property
+    def state(self):
+        """Return closed, open or half_open."""
+        if self.failures < BREAKER_THRESHOLD:
+            return "closed"
+        return "open" if time.monotonic() < self.opened_until else "half_open"
+
+    def check(self):
+        """Raise CircuitOpenError if requests should not be sent."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial):
+            self.short_circuited += 1
+            raise CircuitOpenError(f"Circuit open for {self.name}")
+        if state == "half_open":
+            # Let a single trial request through
+            self._trial = True
+
+    def record(self, success):
+        """Record the outcome of a request; None for a cancelled one."""
+        self._trial = False
+        if success is None:
+            return
+        if success:
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.failures >= BREAKER_THRESHOLD:
+            if time.monotonic() >= self.opened_until:
+                self.trips += 1
+                _LOGGER.warning(
+                    "%d consecutive failures for %s, pausing requests for %d s",
+                    self.failures,
+                    self.name,
+                    BREAKER_COOLDOWN,
+                )
+            self.opened_until = time.monotonic() + BREAKER_COOLDOWN
+
+    def as_dict(self):
+        """Return the breaker state."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+        }
+
+
+def breaker_key(url):
+    """Return the breaker key of a URL: its host, plus the endpoint if it has its own."""
+    url = URL(url)
+    for endpoint in BREAKER_ENDPOINTS:
+        if url.path.startswith(endpoint):
+            return f"{url.host}{endpoint}"
+    return url.host
+
+
+def _outcome(exc):
+    """Return False if an exception means the host is unhealthy, None if cancelled."""
+    if exc is None:
+        return True
+    if isinstance(exc, asyncio.CancelledError):
+        return None
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status < 500 and exc.status != 429
+    return not isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class GuardedSession:
+    """Wrap a ClientSession with a shared budget, timeouts and per-endpoint breakers."""
+
+    def __init__(self, session_factory, per_minute=DEFAULT_REQUEST_BUDGET):
+        """Initialize the guarded session.
+
+        The underlying session is created on first use by session_factory
+        and recreated after async_close.
+        """
+        self._session_factory = session_factory
+        self._session = None
+        self.budget = TokenBucket(per_minute)
+        self.breakers = {}
+        self.timeout = aiohttp.ClientTimeout(
+            total=REQUEST_TOTAL_TIMEOUT,
+            connect=REQUEST_CONNECT_TIMEOUT,
+            sock_read=REQUEST_READ_TIMEOUT,
+        )
+
+    def breaker(self, key):
+        """Return the breaker of a host or endpoint (see breaker_key)."""
+        if (breaker := self.breakers.get(key)) is None:
+            breaker = self.breakers[key] = CircuitBreaker(key)
+        return breaker
+
+    @property
+    def session(self):
+        """Return the underlying session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = self._session_factory()
+        return self._session
+
+    async def async_close(self):
+        """Close the underlying session and its connections."""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    def get(self, url, **kwargs):
+        """Return an async context manager for a guarded GET request."""
+        kwargs.setdefault("timeout", self.timeout)
+        return _GuardedRequest(self, url, kwargs)
+
+    def as_dict(self):
+        """Return the budget and breaker states for diagnostics."""
+        return {
+            "budget": self.budget.as_dict(),
+            "breakers": {
+                key: breaker.as_dict() for key, breaker in self.breakers.items()
+            },
+        }
+
+
+class _GuardedRequest:
+    """Async context manager applying the guards around one request."""
+
+    def __init__(self, guarded, url, kwargs):
+        """Initialize the request."""
+        self._guarded = guarded
+        self._url = url
+        self._kwargs = kwargs
+        self._breaker = guarded.breaker(breaker_key(url))
+        self._context = None
+
+    async def __aenter__(self):
+        """Check the breaker and budget, then send the request."""
+        self._breaker.check()
+        try:
+            await self._guarded.budget.async_acquire()
+        except BaseException:
+            # Nothing was sent; release a half-open trial for the next request
+            self._breaker.record(None)
+            raise
+        self._context = self._guarded.session.get(self._url, **self._kwargs)
+        try:
+            return await self._context.__aenter__()
+        except BaseException as exc:
+            self._breaker.record(_outcome(exc))
+            raise
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        """Release the response and record the outcome."""
+        try:
+            return await self._context.__aexit__(exc_type, exc, traceback)
+        finally:
+            self._breaker.record(_outcome(exc))
@@ -0,0 +1,271 @@
+"""Shared polling hub for all Wunderground Weather stations."""
+import asyncio
+import logging
+import time
+import zlib
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+
+from .const import (
+    DOMAIN,
+    DATA_HUB,
+    BACKFILL_BUDGET_RESERVE,
+    BACKFILL_CONCURRENCY,
+    CONF_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    CONF_REQUEST_BUDGET,
+    DEFAULT_REQUEST_BUDGET,
+    HUB_TICK_INTERVAL,
+    ADAPTIVE_MAX_INTERVAL,
+    UNITS_IMPERIAL,
+    UNITS_METRIC,
+)
+from .archive import ObservationArchive
+from .backfill import HistoryBackfill
+from .client import create_session
+from .forecast import ForecastCache
+from .guard import GuardedSession
+from .singleflight import SingleFlight
+from .snapshot import SnapshotStore
+from .stats import RollingTimer
+from .api import ApiKeyCache, async_with_api_key, fetch_history, fetch_weather_data
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def api_units(hass: HomeAssistant):
+    """Return the API units parameter for the Home Assistant unit system."""
+    return UNITS_IMPERIAL if hass.config.units is US_CUSTOMARY_SYSTEM else UNITS_METRIC
+
+
+class StationSchedule:
+    """Polling state for a single registered station."""
+
+    __slots__ = ("station_id", "coordinator", "interval", "adaptive", "next_due")
+
+    def __init__(self, station_id, coordinator, interval, adaptive, next_due):
+        """Initialize the schedule."""
+        self.station_id = station_id
+        self.coordinator = coordinator
+        self.interval = interval
+        self.adaptive = adaptive
+        self.next_due = next_due
+
+
+class WundergroundHub:
+    """Poll every registered station on one scheduler with bounded concurrency.
+
+    Per-entry coordinators are created without their own update interval; the
+    hub refreshes them when due, so entities keep listening to the coordinator
+    of their config entry.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute=DEFAULT_REQUEST_BUDGET,
+    ):
+        """Initialize the hub."""
+        self.hass = hass
+        # Values are requested in the native units of the unit system at
+        # startup, so they are never converted per read
+        self.units = api_units(hass)
+        # Every upstream request shares one budget, per-host breakers and a
+        # connection pool of its own
+        self.session = GuardedSession(create_session, requests_per_minute)
+        self.key_cache = ApiKeyCache()
+        self.snapshot = SnapshotStore(hass, self.units)
+        self.backfill = HistoryBackfill(hass, self)
+        self.archive = ObservationArchive(hass, self.units)
+        self.forecasts = ForecastCache(self.session, self.key_cache, self.units)
+        # Concurrent fetches of the same (endpoint, station) share one request
+        self.flights = SingleFlight()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._history_semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+        self._stations = {}
+        self._in_flight = set()
+        self._unsub_tick = None
+        # How late the scheduler tick fires, a sample of event loop lag
+        self.loop_lag = RollingTimer()
+        self._last_tick = None
+
+    @property
+    def station_count(self):
+        """Return the number of registered stations."""
+        return len(self._stations)
+
+    async def async_load(self):
+        """Load the persisted snapshot once and restore the API key."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            await self.snapshot.async_load()
+            await self.backfill.async_load()
+            api_key, fetched_at = self.snapshot.api_key
+            if api_key and fetched_at:
+                self.key_cache.restore(api_key, fetched_at)
+            self._loaded = True
+
+    @callback
+    def async_store_observation(self, station_id, observation):
+        """Persist a good observation (debounced)."""
+        self.snapshot.async_update(station_id, observation, self.key_cache)
+
+    @callback
+    def async_register(self, station_id, coordinator, interval, adaptive=False):
+        """Register a station coordinator with the hub."""
+        # Spread stations deterministically over their interval so polls of
+        # many stations don't all fire on the same tick
+        phase = zlib.crc32(station_id.encode()) % max(int(interval), 1)
+        self._stations[station_id] = StationSchedule(
+            station_id, coordinator, interval, adaptive, time.monotonic() + phase
+        )
+        if self._unsub_tick is None:
+            self._last_tick = None
+            self._unsub_tick = async_track_time_interval(
+                self.hass, self._async_tick, timedelta(seconds=HUB_TICK_INTERVAL)
+            )
+        _LOGGER.debug(
+            "Registered station %s with hub (%d stations)", station_id, len(self._stations)
+        )
+
+    def has_station(self, station_id):
+        """Return True if a station is registered."""
+        return station_id in self._stations
+
+    def get_coordinator(self, station_id):
+        """Return the coordinator of a registered station, or None."""
+        schedule = self._stations.get(station_id)
+        return schedule.coordinator if schedule else None
+
+    @callback
+    def async_unregister(self, station_id):
+        """Remove a station from the hub."""
+        self._stations.pop(station_id, None)
+        self.backfill.async_cancel(station_id)
+        if not self._stations and self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+
+    async def async_close(self):
+        """Flush the archive and close the connection pool once no station is left."""
+        if not self._stations:
+            await self.archive.async_flush()
+            await self.session.async_close()
+
+    def footprint(self):
+        """Return the sizes of the state kept by the hub, to spot growth over time."""
+        return {
+            "stations": len(self._stations),
+            "polls_in_flight": len(self._in_flight),
+            "requests_in_flight": self.flights.stats["in_flight"],
+            "forecasts_cached": len(self.forecasts),
+            "breakers": len(self.session.breakers),
+            "archive_buffered": self.archive.as_dict()["buffered"],
+            "backfill": self.backfill.stats,
+        }
+
+    @callback
+    def async_set_schedule(self, station_id, interval, adaptive=False):
+        """Change the polling interval and mode of a station."""
+        if schedule := self._stations.get(station_id):
+            schedule.interval = interval
+            schedule.adaptive = adaptive
+            schedule.next_due = min(schedule.next_due, time.monotonic() + interval)
+
+    async def async_fetch(self, station_id, stats=None):
+        """Fetch data for a station, waiting for a free concurrency slot."""
+        return await self.flights.async_do(
+            ("observations", station_id),
+            lambda: self._async_fetch(station_id, stats),
+        )
+
+    async def _async_fetch(self, station_id, stats):
+        """Fetch data for a station within the concurrency limit."""
+        async with self._semaphore:
+            return await fetch_weather_data(
+                self.session, station_id, self.key_cache, stats, self.units
+            )
+
+    async def async_fetch_history(self, station_id, date, resolution, stats=None):
+        """Fetch one day of station history, behind the polls."""
+        return await self.flights.async_do(
+            ("history", station_id, date, resolution),
+            lambda: self._async_fetch_history(station_id, date, resolution, stats),
+        )
+
+    async def _async_fetch_history(self, station_id, date, resolution, stats):
+        """Fetch one day of station history within the backfill limits."""
+        async with self._history_semaphore:
+            budget = self.session.budget
+            await budget.async_wait_for(budget.capacity * BACKFILL_BUDGET_RESERVE)
+            return await async_with_api_key(
+                self.session,
+                station_id,
+                self.key_cache,
+                stats,
+                lambda api_key: fetch_history(
+                    self.session, station_id, api_key, date, resolution, stats, self.units
+                ),
+            )
+
+    async def _async_tick(self, _now=None):
+        """Refresh every station whose poll is due."""
+        now = time.monotonic()
+        if self._last_tick is not None:
+            self.loop_lag.add(max(now - self._last_tick - HUB_TICK_INTERVAL, 0))
+        self._last_tick = now
+        due = []
+        for schedule in self._stations.values():
+            if schedule.next_due > now or schedule.station_id in self._in_flight:
+                continue
+            if schedule.coordinator.push_active:
+                # The station pushes its uploads to us, cloud polling is the fallback
+                schedule.next_due = now + schedule.interval
+                continue
+            if schedule.adaptive:
+                # Rescheduled from the learned cadence once the poll finishes
+                schedule.next_due = float("inf")
+                due.append(schedule)
+                continue
+            schedule.next_due += schedule.interval
+            if schedule.next_due <= now:
+                # Fell behind (e.g. after a long stall), don't burst to catch up
+                schedule.next_due = now + schedule.interval
+            due.append(schedule)
+
+        if due:
+            await asyncio.gather(*(self._async_refresh(schedule) for schedule in due))
+
+    async def _async_refresh(self, schedule):
+        """Refresh one station coordinator."""
+        self._in_flight.add(schedule.station_id)
+        try:
+            await schedule.coordinator.async_refresh()
+        finally:
+            self._in_flight.discard(schedule.station_id)
+            if schedule.adaptive:
+                delay = schedule.coordinator.cadence.next_delay(
+                    schedule.interval, ADAPTIVE_MAX_INTERVAL
+                )
+                schedule.next_due = time.monotonic() + delay
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> WundergroundHub:
+    """Return the hub for this Home Assistant instance, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (hub := domain_data.get(DATA_HUB)) is None:
+        hub = domain_data[DATA_HUB] = WundergroundHub(
+            hass,
+            domain_data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            domain_data.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET),
+        )
+    return hub
@@ -0,0 +1,177 @@
+"""Compact decoded observation of a Wunderground station."""
+import logging
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from .const import (
+    IMPERIAL_SENSOR_DEADBANDS,
+    IMPERIAL_SENSOR_UNITS,
+    DEFAULT_SENSOR_DEADBANDS,
+    SENSOR_FIELDS,
+    SENSOR_TYPES,
+    UNITS_IMPERIAL,
+    UNITS_METRIC,
+    UNITS_SECTIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Position of each sensor type in Observation.values
+FIELD_INDEX = {sensor_type: index for index, sensor_type in enumerate(SENSOR_TYPES)}
+# Values the condition rules read; like the scalar rules, the condition
+# treats all of them as 0 when any one can't be converted
+CONDITION_FIELDS = (
+    "temperature",
+    "humidity",
+    "wind_speed",
+    "precip_rate",
+    "solar_radiation",
+    "uv",
+)
+
+
+class Observation(NamedTuple):
+    """Immutable observation with values pre-converted to floats.
+
+    values holds one float (or None) per sensor type, in SENSOR_TYPES order.
+    malformed is True if a value of CONDITION_FIELDS was present but not a
+    number.
+    """
+
+    obs_time: Optional[datetime]
+    local_hour: Optional[int]
+    values: tuple
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    malformed: bool = False
+
+    def value(self, sensor_type):
+        """Return the value of a sensor type."""
+        return self.values[FIELD_INDEX[sensor_type]]
+
+
+def sensor_unit(sensor_type, units):
+    """Return the native unit of a sensor type for an API units parameter."""
+    if units == UNITS_IMPERIAL:
+        return IMPERIAL_SENSOR_UNITS.get(sensor_type, SENSOR_TYPES[sensor_type][1])
+    return SENSOR_TYPES[sensor_type][1]
+
+
+def default_deadband(sensor_type, units):
+    """Return the default deadband of a sensor type in its native unit."""
+    if units == UNITS_IMPERIAL:
+        return IMPERIAL_SENSOR_DEADBANDS[sensor_type]
+    return DEFAULT_SENSOR_DEADBANDS[sensor_type]
+
+
+def _to_float(value):
+    """Convert an API value to float, or None if missing or invalid."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        _LOGGER.warning("Error converting sensor value to number: %s", value)
+        return None
+
+
+def _parse_obs_time(value):
+    """Parse obsTimeUtc into an aware datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _parse_local_hour(value):
+    """Return the hour of obsTimeLocal ("YYYY-MM-DD HH:MM:SS")."""
+    try:
+        if value and " " in value:
+            time_str = value.split(" ")[1]
+            if ":" in time_str:
+                return int(time_str.split(":")[0])
+    except (ValueError, IndexError):
+        _LOGGER.warning("Could not parse observation time: %s", value)
+    return None
+
+
+def decode_observation(data, units=UNITS_METRIC, fields=None):
+    """Decode an observations/current payload, or return None.
+
+    Only the sensor types in fields (all if None) are decoded, the others
+    are None.
+    """
+    if not data or not isinstance(data, dict):
+        return None
+    # Handle the case where data might be in observations array
+    if "observations" in data:
+        observations = data["observations"]
+        if not isinstance(observations, list) or not observations:
+            return None
+        data = observations[0]
+    if not isinstance(data, dict):
+        _LOGGER.warning("Unexpected data format: %s", data)
+        return None
+
+    section = data.get(UNITS_SECTIONS[units]) or {}
+    # SENSOR_FIELDS is in SENSOR_TYPES order
+    raw = [
+        (section if source == "units" else data).get(key)
+        for source, key in SENSOR_FIELDS.values()
+    ]
+    values = tuple(
+        _to_float(value) if fields is None or sensor_type in fields else None
+        for sensor_type, value in zip(SENSOR_TYPES, raw)
+    )
+    malformed = False
+    for sensor_type in CONDITION_FIELDS:
+        value = raw[FIELD_INDEX[sensor_type]]
+        if value is None:
+            continue
+        if fields is None or sensor_type in fields:
+            converted = values[FIELD_INDEX[sensor_type]]
+        else:
+            converted = _to_float(value)
+        if converted is None:
+            malformed = True
+            break
+    return Observation(
+        _parse_obs_time(data.get("obsTimeUtc")),
+        _parse_local_hour(data.get("obsTimeLocal")),
+        values,
+        _to_float(data.get("lat")),
+        _to_float(data.get("lon")),
+        malformed,
+    )
+
+
+def observation_to_dict(observation):
+    """Serialize an observation for storage."""
+    return {
+        "obs_time": observation.obs_time.isoformat() if observation.obs_time else None,
+        "local_hour": observation.local_hour,
+        "values": list(observation.values),
+        "latitude": observation.latitude,
+        "longitude": observation.longitude,
+        "malformed": observation.malformed,
+    }
+
+
+def observation_from_dict(data):
+    """Restore a stored observation, or return None if it doesn't match SENSOR_TYPES."""
+    try:
+        values = tuple(data["values"])
+        if len(values) != len(SENSOR_TYPES):
+            return None
+        return Observation(
+            _parse_obs_time(data.get("obs_time")),
+            data.get("local_hour"),
+            values,
+            data.get("latitude"),
+            data.get("longitude"),
+            bool(data.get("malformed", False)),
+        )
+    except (KeyError, TypeError):
+        return None
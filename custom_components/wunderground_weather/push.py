@@ -0,0 +1,148 @@
+"""Local ingestion of the Wunderground PWS upload protocol."""
+import hmac
+import logging
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+from aiohttp import ClientResponseError, web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    SENSOR_TYPES,
+    CONF_PUSH_ENABLED,
+    CONF_PUSH_FORWARD,
+    CONF_PUSH_PASSWORD,
+    PUSH_URL,
+    PUSH_FORWARD_URL,
+    UNITS_METRIC,
+)
+from .hub import async_get_hub
+from .observation import Observation
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upload parameter and conversion from the imperial upload to the metric unit
+# of each sensor type
+PUSH_FIELDS = {
+    "temperature": ("tempf", lambda f: (f - 32) * 5 / 9),
+    "humidity": ("humidity", None),
+    "pressure": ("baromin", lambda inhg: inhg * 33.8639),
+    "wind_speed": ("windspeedmph", lambda mph: mph * 1.609344),
+    "wind_gust": ("windgustmph", lambda mph: mph * 1.609344),
+    "wind_bearing": ("winddir", None),
+    "dew_point": ("dewptf", lambda f: (f - 32) * 5 / 9),
+    "solar_radiation": ("solarradiation", None),
+    "uv": ("UV", None),
+    # Rain over the past hour, i.e. the current rate per hour
+    "precip_rate": ("rainin", lambda inches: inches * 25.4),
+    "precip_total": ("dailyrainin", lambda inches: inches * 25.4),
+}
+# Stations send this for sensors they don't have
+MISSING_VALUE = -9999
+
+
+def _convert(query, sensor_type, units):
+    """Return the value of a sensor in the given units from the upload query, or None."""
+    key, convert = PUSH_FIELDS[sensor_type]
+    try:
+        value = float(query[key])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if value <= MISSING_VALUE:
+        return None
+    if convert is None or units != UNITS_METRIC:
+        # Uploads are in imperial units already
+        return value
+    return round(convert(value), 2)
+
+
+def _obs_time(value):
+    """Parse dateutc ("now" or "YYYY-MM-DD HH:MM:SS")."""
+    if value and value != "now":
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return dt_util.utcnow().replace(microsecond=0)
+
+
+def _authorized(options, query):
+    """Return True if push is enabled and the upload carries the station key."""
+    expected = options.get(CONF_PUSH_PASSWORD)
+    if not options.get(CONF_PUSH_ENABLED) or not expected:
+        return False
+    return hmac.compare_digest(query.get("PASSWORD", "").encode(), expected.encode())
+
+
+def decode_upload(query, previous=None, units=UNITS_METRIC, fields=None):
+    """Convert an upload query into an Observation.
+
+    The location is kept from the previous observation, uploads don't carry it.
+    Only the sensor types in fields (all if None) are decoded.
+    """
+    obs_time = _obs_time(query.get("dateutc"))
+    return Observation(
+        obs_time,
+        dt_util.as_local(obs_time).hour,
+        tuple(
+            _convert(query, sensor_type, units)
+            if fields is None or sensor_type in fields
+            else None
+            for sensor_type in SENSOR_TYPES
+        ),
+        previous.latitude if previous else None,
+        previous.longitude if previous else None,
+    )
+
+
+class WundergroundPushView(HomeAssistantView):
+    """Accept updateweatherstation.php uploads from stations with push enabled."""
+
+    url = PUSH_URL
+    name = "api:wunderground_weather:push"
+    # Stations can't authenticate against Home Assistant; only uploads of
+    # configured stations with push enabled and their station key are accepted
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the view."""
+        self.hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle an upload."""
+        query = request.query
+        station_id = query.get("ID")
+        hub = async_get_hub(self.hass)
+        coordinator = hub.get_coordinator(station_id) if station_id else None
+        if coordinator is None or not _authorized(coordinator.config_entry.options, query):
+            _LOGGER.debug("Rejected upload for station %s", station_id)
+            return web.Response(text="unauthorized\n", status=HTTPStatus.UNAUTHORIZED)
+
+        coordinator.async_push(
+            decode_upload(query, coordinator.data, hub.units, coordinator.decoded_fields)
+        )
+        _LOGGER.debug("Received upload from station %s", station_id)
+
+        if coordinator.config_entry.options.get(CONF_PUSH_FORWARD):
+            self.hass.async_create_background_task(
+                self._async_forward(hub, dict(query)),
+                f"wunderground_weather_forward_{station_id}",
+            )
+        return web.Response(text="success\n")
+
+    async def _async_forward(self, hub, query):
+        """Forward the upload to Wunderground."""
+        try:
+            async with hub.session.get(PUSH_FORWARD_URL, params=query) as response:
+                response.raise_for_status()
+        # The errors' messages can include the URL and with it the station key
+        except ClientResponseError as err:
+            _LOGGER.warning(
+                "Error forwarding upload of station %s: HTTP %s", query.get("ID"), err.status
+            )
+        except Exception as err:
+            _LOGGER.warning(
+                "Error forwarding upload of station %s: %s", query.get("ID"), type(err).__name__
+            )
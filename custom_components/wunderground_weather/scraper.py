@@ -0,0 +1,165 @@
+"""Extract the SUN_API_KEY from the Wunderground dashboard page."""
+import logging
+import re
+import time
+
+from .client import JSONDecodeError, json_loads
+from .const import DASHBOARD_URL
+from .stats import StationStats
+
+_LOGGER = logging.getLogger(__name__)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+SCRAPE_CHUNK_SIZE = 16 * 1024
+
+APP_STATE_MARKER = b'id="app-root-state"'
+SCRIPT_END_MARKER = b"</script>"
+# Inside the app state quotes are escaped as "&q;"
+API_KEY_PATTERN = re.compile(
+    rb'SUN_API_KEY(?:&q;|")\s*:\s*(?:&q;|")([^&"<\s]{1,128})(?:&q;|")'
+)
+# Longest partial match that has to survive between chunks
+_OVERLAP = 256
+
+
+def dashboard_url(station_id):
+    """Return the dashboard URL for a station."""
+    return DASHBOARD_URL.format(station_id=station_id)
+
+
+class ApiKeyScanner:
+    """Incremental byte-level scanner for the SUN_API_KEY in the app state."""
+
+    def __init__(self):
+        """Initialize the scanner."""
+        self._buffer = b""
+        self._in_state = False
+        self.bytes_scanned = 0
+
+    def feed(self, chunk):
+        """Feed a chunk of the page and return the key once found.
+
+        Raises ValueError when the app state script ends without a key.
+        """
+        self.bytes_scanned += len(chunk)
+        buffer = self._buffer + chunk
+
+        if not self._in_state:
+            index = buffer.find(APP_STATE_MARKER)
+            if index < 0:
+                self._buffer = buffer[-len(APP_STATE_MARKER):]
+                return None
+            tag_end = buffer.find(b">", index)
+            if tag_end < 0:
+                self._buffer = buffer[index:]
+                return None
+            self._in_state = True
+            buffer = buffer[tag_end + 1:]
+
+        match = API_KEY_PATTERN.search(buffer)
+        if match:
+            end = buffer.find(SCRIPT_END_MARKER)
+            if end < 0 or match.end() <= end:
+                return match.group(1).decode("ascii")
+
+        if SCRIPT_END_MARKER in buffer:
+            raise ValueError("API key not found in app state!")
+
+        self._buffer = buffer[-_OVERLAP:]
+        return None
+
+
+async def scrape_api_key(session, station_id, stats=None):
+    """Scrape the SUN_API_KEY from the station dashboard page."""
+    if stats is None:
+        stats = StationStats()
+    try:
+        return await _scrape_api_key_streaming(session, station_id, stats)
+    except ValueError as e:
+        _LOGGER.debug(
+            "Streaming key extraction failed for station %s (%s), falling back to full parse",
+            station_id,
+            e,
+        )
+        return await _scrape_api_key_full(session, station_id, stats)
+
+
+async def _scrape_api_key_streaming(session, station_id, stats):
+    """Read the dashboard in chunks and stop as soon as the key is found."""
+    scanner = ApiKeyScanner()
+    scan_time = 0.0
+    start = time.monotonic()
+    try:
+        async with session.get(dashboard_url(station_id), headers=HEADERS) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(SCRAPE_CHUNK_SIZE):
+                scan_start = time.monotonic()
+                try:
+                    api_key = scanner.feed(chunk)
+                finally:
+                    scan_time += time.monotonic() - scan_start
+                if api_key:
+                    _LOGGER.debug(
+                        "Found API key after %d bytes of dashboard for station %s",
+                        scanner.bytes_scanned,
+                        station_id,
+                    )
+                    if response.content.is_eof():
+                        # The whole body already arrived, so the connection is
+                        # back in the pool with reading paused on the buffered
+                        # rest; consume it or the next request on it stalls
+                        while await response.content.readany():
+                            pass
+                    # Otherwise leaving the context closes the connection
+                    # without reading the rest
+                    return api_key
+    finally:
+        stats.add("dashboard", time.monotonic() - start - scan_time)
+        stats.add("parse", scan_time)
+        stats.add_sync(scan_time)
+        stats.add_bytes(scanner.bytes_scanned)
+
+    raise ValueError("Script tag content is empty or missing!")
+
+
+async def _scrape_api_key_full(session, station_id, stats):
+    """Download the whole dashboard and parse it with BeautifulSoup."""
+    with stats.time("dashboard"):
+        async with session.get(dashboard_url(station_id), headers=HEADERS) as response:
+            response.raise_for_status()
+            body = await response.read()
+            html_content = body.decode(response.get_encoding(), errors="replace")
+    stats.add_bytes(len(body))
+
+    with stats.time("parse", sync=True):
+        return parse_api_key(html_content)
+
+
+def parse_api_key(html_content):
+    """Extract the API key from a full dashboard page."""
+    # Only needed when the streaming scan fails, so imported on demand
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    script_tag = soup.find("script", {"id": "app-root-state", "type": "application/json"})
+
+    if not script_tag or not script_tag.string or not script_tag.string.strip():
+        raise ValueError("Script tag content is empty or missing!")
+
+    script_content = script_tag.string.replace("&q;", "\"")
+
+    try:
+        json_data = json_loads(script_content)
+    except JSONDecodeError as e:
+        _LOGGER.error(f"Error decoding JSON: {e}")
+        raise ValueError("Failed to parse weather data from script tag!")
+
+    api_key = json_data.get("process.env", {}).get("SUN_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found in data!")
+
+    return api_key
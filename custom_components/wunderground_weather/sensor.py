@@ -5,7 +5,9 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import (
@@ -14,13 +16,24 @@ from homeassistant.helpers.update_coordinator import (
 )
 from homeassistant.util import dt as dt_util
 import logging
+import time
 
 from .const import (
     DOMAIN,
     SENSOR_TYPES,
+    SENSOR_STATE_CLASSES,
+    DIAGNOSTIC_SENSOR_TYPES,
+    TREND_FIELDS,
     CONF_UPDATE_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
+    CONF_DEADBAND_PREFIX,
+    CONF_DEADBAND_RELATIVE,
+    CONF_HEARTBEAT,
+    DEFAULT_DEADBAND_RELATIVE,
+    DEFAULT_HEARTBEAT,
 )
+from .observation import FIELD_INDEX, default_deadband, sensor_unit
+from .trends import TREND_ATTRIBUTES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,9 +44,21 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Wunderground Weather sensor platform."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    station_id = config_entry.data["station_id"]
+    
+    # Remove the entities of sensor types that are no longer selected
+    registry = er.async_get(hass)
+    for sensor_type in SENSOR_TYPES:
+        if sensor_type in coordinator.sensor_types:
+            continue
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{station_id}_{sensor_type}")
+        if entity_id:
+            registry.async_remove(entity_id)
     
     sensors = []
     for sensor_type in SENSOR_TYPES:
+        if sensor_type not in coordinator.sensor_types:
+            continue
         sensors.append(
             WundergroundWeatherSensor(
                 coordinator,
@@ -42,12 +67,26 @@ async def async_setup_entry(
             )
         )
     
-    async_add_entities(sensors, True)
+    for sensor_type in DIAGNOSTIC_SENSOR_TYPES:
+        sensors.append(
+            WundergroundDiagnosticSensor(
+                coordinator,
+                config_entry.data["station_id"],
+                sensor_type,
+            )
+        )
+    
+    # The coordinator's background refresh updates the entities; never poll
+    # on add, it would block setup on the network
+    async_add_entities(sensors, False)
 
 
 class WundergroundWeatherSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Wunderground Weather sensor."""
 
+    # Change on nearly every write; recording them would undo the deadband
+    _unrecorded_attributes = frozenset({"writes_avoided"}) | TREND_ATTRIBUTES
+
     def __init__(self, coordinator: DataUpdateCoordinator, station_id: str, sensor_type: str):
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -56,74 +95,85 @@ class WundergroundWeatherSensor(CoordinatorEntity, SensorEntity):
         self._station_name = coordinator.config_entry.data.get("station_name", f"Station {station_id}")
         self._attr_name = f"{SENSOR_TYPES[sensor_type][0]} {self._station_name}"
         self._attr_unique_id = f"{station_id}_{sensor_type}"
-        self._attr_native_unit_of_measurement = SENSOR_TYPES[sensor_type][1]
+        self._attr_native_unit_of_measurement = sensor_unit(sensor_type, coordinator.hub.units)
         self._attr_icon = SENSOR_TYPES[sensor_type][2]
+        self._index = FIELD_INDEX[sensor_type]
+        self._written_value = None
+        self._written_available = None
+        self._written_stale = None
+        self._written_source = None
+        self._written_at = None
+        self.writes_avoided = 0
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only for significant changes or when the heartbeat expires."""
+        value = self.native_value
+        available = self.available
+        stale = self.coordinator.stale
+        source = self.coordinator.source_station
+        now = time.monotonic()
+
+        if (
+            self._written_at is not None
+            and available == self._written_available
+            and stale == self._written_stale
+            and source == self._written_source
+            and not self._is_significant(value)
+            and now - self._written_at < self._option(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)
+        ):
+            self.writes_avoided += 1
+            return
+
+        self._written_value = value
+        self._written_available = available
+        self._written_stale = stale
+        self._written_source = source
+        self._written_at = now
+        self.async_write_ha_state()
+
+    def _option(self, key, default):
+        """Return an option of the config entry."""
+        return self.coordinator.config_entry.options.get(key, default)
+
+    def _is_significant(self, value) -> bool:
+        """Return True if value differs from the last written one by more than the deadband."""
+        previous = self._written_value
+        if value is None or previous is None:
+            return value != previous
+
+        delta = abs(value - previous)
+        threshold = max(
+            self._option(
+                f"{CONF_DEADBAND_PREFIX}{self._sensor_type}",
+                default_deadband(self._sensor_type, self.coordinator.hub.units),
+            ),
+            abs(previous) * self._option(CONF_DEADBAND_RELATIVE, DEFAULT_DEADBAND_RELATIVE) / 100,
+        )
+        if threshold <= 0:
+            return delta > 0
+        # Tolerate float noise for changes exactly at the deadband
+        return delta >= threshold - 1e-9
 
     @property
-    def _data(self):
-        """Get the processed data from coordinator."""
-        if not self.coordinator.data:
-            return None
-            
-        data = self.coordinator.data
-        # Handle the case where data might be in observations array
-        if "observations" in data and isinstance(data["observations"], list) and len(data["observations"]) > 0:
-            return data["observations"][0]
-        return data
+    def extra_state_attributes(self):
+        """Return skipped writes, staleness and rolling-window trends."""
+        attributes = {
+            "writes_avoided": self.writes_avoided,
+            "stale": self.coordinator.stale,
+            "source_station": self.coordinator.source_station,
+        }
+        if self._sensor_type in TREND_FIELDS:
+            attributes.update(self.coordinator.trends.attributes(self._sensor_type))
+        return attributes
 
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        data = self._data
-        if not data:
+        observation = self.coordinator.data
+        if not observation:
             return None
-
-        # Check if data is in the expected format
-        if not isinstance(data, dict):
-            _LOGGER.warning("Unexpected data format: %s", data)
-            return None
-            
-        metric = data.get("metric", {})
-
-        try:
-            if self._sensor_type == "temperature":
-                value = metric.get("temp")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "humidity":
-                value = data.get("humidity")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "pressure":
-                value = metric.get("pressure")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "wind_speed":
-                value = metric.get("windSpeed")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "wind_gust":
-                value = metric.get("windGust")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "wind_bearing":
-                value = data.get("winddir")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "dew_point":
-                value = metric.get("dewpt")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "solar_radiation":
-                value = data.get("solarRadiation")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "uv":
-                value = data.get("uv")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "precip_rate":
-                value = metric.get("precipRate")
-                return float(value) if value is not None else None
-            elif self._sensor_type == "precip_total":
-                value = metric.get("precipTotal")
-                return float(value) if value is not None else None
-        except (ValueError, TypeError) as e:
-            _LOGGER.warning("Error converting sensor value to number: %s", e)
-            return None
-        
-        return None
+        return observation.values[self._index]
 
     @property
     def device_class(self) -> SensorDeviceClass | None:
@@ -139,8 +189,46 @@ class WundergroundWeatherSensor(CoordinatorEntity, SensorEntity):
     @property
     def state_class(self) -> SensorStateClass | None:
         """Return the state class of the sensor."""
-        if self._sensor_type in ["temperature", "pressure"]:
-            return SensorStateClass.MEASUREMENT
-        elif self._sensor_type == "humidity":
-            return SensorStateClass.MEASUREMENT
-        return None 
\ No newline at end of file
+        if state_class := SENSOR_STATE_CLASSES.get(self._sensor_type):
+            return SensorStateClass(state_class)
+        return None
+
+
+class WundergroundDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor reporting fetch statistics of a station."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: DataUpdateCoordinator, station_id: str, sensor_type: str):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._sensor_type = sensor_type
+        station_name = coordinator.config_entry.data.get("station_name", f"Station {station_id}")
+        self._attr_name = f"{DIAGNOSTIC_SENSOR_TYPES[sensor_type][0]} {station_name}"
+        self._attr_unique_id = f"{station_id}_{sensor_type}"
+        self._attr_native_unit_of_measurement = DIAGNOSTIC_SENSOR_TYPES[sensor_type][1]
+        self._attr_icon = DIAGNOSTIC_SENSOR_TYPES[sensor_type][2]
+        if sensor_type == "bytes_received":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the p95 duration in ms, or the bytes received."""
+        stats = self.coordinator.stats
+        if self._sensor_type == "bytes_received":
+            return stats.bytes_received
+        stage = "total" if self._sensor_type == "poll_duration" else "sync"
+        value = stats.p95(stage)
+        return round(value * 1000, 2) if value is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the summary of the stage."""
+        if self._sensor_type == "bytes_received":
+            return None
+        stage = "total" if self._sensor_type == "poll_duration" else "sync"
+        timer = self.coordinator.stats.stages.get(stage)
+        return timer.as_dict() if timer else None
@@ -0,0 +1,48 @@
+"""Coalesce concurrent identical requests into one."""
+import asyncio
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._calls = {}
+        self._waiters = {}
+        self.issued = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self):
+        """Return the issued, coalesced and in-flight call counters."""
+        return {"issued": self.issued, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+    async def async_do(self, key, factory):
+        """Return the result of factory(), joining a call for key already in flight."""
+        if (task := self._calls.get(key)) is not None:
+            self.coalesced += 1
+        else:
+            self.issued += 1
+            task = self._calls[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shielded so a cancelled caller doesn't cancel the shared call; the
+        # call itself is only cancelled once every caller has given up
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if (waiters := self._waiters.pop(task) - 1) > 0:
+                self._waiters[task] = waiters
+
+    def _forget(self, key, task):
+        """Drop a finished call."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller was cancelled
+            task.exception()
@@ -0,0 +1,76 @@
+"""Persist the last good observation and API key across restarts."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    UNITS_METRIC,
+)
+from .observation import observation_from_dict, observation_to_dict
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Snapshot of the last good observation per station and the API key.
+
+    Writes are debounced by the Store helper, so updates of many stations
+    end up in one write.
+    """
+
+    def __init__(self, hass: HomeAssistant, units=UNITS_METRIC):
+        """Initialize the snapshot store."""
+        self._units = units
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._api_key = None
+        self._api_key_fetched_at = None
+        self._stations = {}
+
+    async def async_load(self):
+        """Load the snapshot from disk."""
+        data = await self._store.async_load() or {}
+        self._api_key = data.get("api_key")
+        self._api_key_fetched_at = data.get("api_key_fetched_at")
+        self._stations = data.get("stations", {})
+        _LOGGER.debug("Loaded snapshot for %d stations", len(self._stations))
+
+    @property
+    def api_key(self):
+        """Return the stored API key and the epoch time it was scraped."""
+        return self._api_key, self._api_key_fetched_at
+
+    def get_observation(self, station_id):
+        """Return the stored observation of a station, or None."""
+        if (data := self._stations.get(station_id)) is None:
+            return None
+        if data.get("units", UNITS_METRIC) != self._units:
+            # Stored before the unit system changed
+            return None
+        return observation_from_dict(data)
+
+    @callback
+    def async_update(self, station_id, observation, key_cache):
+        """Record a good observation and the current API key, and schedule a save."""
+        self._stations[station_id] = {**observation_to_dict(observation), "units": self._units}
+        self._api_key = key_cache.key
+        self._api_key_fetched_at = key_cache.fetched_at
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, station_id):
+        """Forget a station."""
+        if self._stations.pop(station_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self):
+        """Return the data to write to disk."""
+        return {
+            "api_key": self._api_key,
+            "api_key_fetched_at": self._api_key_fetched_at,
+            "stations": self._stations,
+        }
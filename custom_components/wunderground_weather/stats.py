@@ -0,0 +1,102 @@
+"""Per-station timing and transfer statistics."""
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .const import STATS_WINDOW
+
+
+class RollingTimer:
+    """Rolling window of durations with percentile summaries."""
+
+    def __init__(self, size=STATS_WINDOW):
+        """Initialize the timer."""
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds):
+        """Add a duration."""
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, percent):
+        """Return a percentile of the window in seconds, or None."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def as_dict(self):
+        """Return p50/p95/max in milliseconds."""
+        if not self._samples:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "max_ms": round(max(self._samples) * 1000, 2),
+        }
+
+
+class StationStats:
+    """Timing of each fetch stage of a station.
+
+    Stages: dashboard (GET of the dashboard page), parse (API key extraction),
+    api (observations request), api_decode (JSON decode), primary (completed
+    fetches of the primary station), decode (Observation decode) and total.
+    Stages marked as synchronous also add to the event loop time spent in the
+    current poll.
+    """
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self.stages = {}
+        self.bytes_received = 0
+        self.sync_time = 0.0
+        self._poll_sync_time = 0.0
+
+    @contextmanager
+    def time(self, stage, sync=False):
+        """Time a block as the given stage."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self.add(stage, elapsed)
+            if sync:
+                self.sync_time += elapsed
+                self._poll_sync_time += elapsed
+
+    def add(self, stage, seconds):
+        """Add a duration to a stage."""
+        if (timer := self.stages.get(stage)) is None:
+            timer = self.stages[stage] = RollingTimer()
+        timer.add(seconds)
+
+    def add_sync(self, seconds):
+        """Add event loop time spent outside a timed stage."""
+        self.sync_time += seconds
+        self._poll_sync_time += seconds
+
+    def add_bytes(self, count):
+        """Add bytes received from upstream."""
+        self.bytes_received += count
+
+    def end_poll(self):
+        """Record the event loop time of the finished poll."""
+        self.add("sync", self._poll_sync_time)
+        self._poll_sync_time = 0.0
+
+    def p95(self, stage):
+        """Return the p95 of a stage in seconds, or None."""
+        timer = self.stages.get(stage)
+        return timer.percentile(95) if timer else None
+
+    def as_dict(self):
+        """Return the statistics for diagnostics."""
+        return {
+            "stages": {stage: timer.as_dict() for stage, timer in self.stages.items()},
+            "bytes_received": self.bytes_received,
+            "sync_time_ms": round(self.sync_time * 1000, 2),
+        }
@@ -0,0 +1,155 @@
+"""Rolling-window statistics over recent observations of a station."""
+import math
+import time
+from array import array
+from collections import deque
+
+from .const import TREND_CAPACITY, TREND_FIELDS, TREND_WINDOWS
+from .observation import FIELD_INDEX
+
+# Statistics reported per window, as "<stat>_<window>" attributes
+TREND_STATS = ("min", "max", "mean", "change")
+TREND_ATTRIBUTES = frozenset(
+    f"{stat}_{window}" for stat in TREND_STATS for window in TREND_WINDOWS
+)
+
+
+class WindowAggregate:
+    """Incremental sum/count/min/max of one field over a time window.
+
+    Min and max use monotonic deques of ring sequence numbers, so adding and
+    evicting a sample are amortized O(1).
+    """
+
+    __slots__ = ("seconds", "start", "total", "count", "_min", "_max")
+
+    def __init__(self, seconds):
+        """Initialize the aggregate."""
+        self.seconds = seconds
+        self.start = 0
+        self.total = 0.0
+        self.count = 0
+        self._min = deque()
+        self._max = deque()
+
+    def add(self, seq, value, values):
+        """Add the sample at seq."""
+        if math.isnan(value):
+            return
+        self.total += value
+        self.count += 1
+        while self._min and values[self._min[-1]] >= value:
+            self._min.pop()
+        self._min.append(seq)
+        while self._max and values[self._max[-1]] <= value:
+            self._max.pop()
+        self._max.append(seq)
+
+    def evict(self, seq, value):
+        """Remove the sample at seq, the oldest in the window."""
+        self.start = seq + 1
+        if math.isnan(value):
+            return
+        self.total -= value
+        self.count -= 1
+        if self._min and self._min[0] == seq:
+            self._min.popleft()
+        if self._max and self._max[0] == seq:
+            self._max.popleft()
+
+
+class StationTrends:
+    """Fixed-size ring buffer of recent observations with windowed statistics."""
+
+    def __init__(self, capacity=TREND_CAPACITY, windows=TREND_WINDOWS, fields=TREND_FIELDS):
+        """Initialize the ring buffer."""
+        self.capacity = capacity
+        self.windows = windows
+        self.fields = fields
+        self._times = array("d", [0.0]) * capacity
+        self._values = {field: array("d", [math.nan]) * capacity for field in fields}
+        self._aggregates = {
+            field: {name: WindowAggregate(seconds) for name, seconds in windows.items()}
+            for field in fields
+        }
+        # Sequence number of the next sample; slot is seq % capacity
+        self._next = 0
+
+    def add(self, observation):
+        """Add an observation to the ring."""
+        seq = self._next
+        slot = seq % self.capacity
+        now = observation.obs_time.timestamp() if observation.obs_time else time.time()
+
+        # Evict before the slot is overwritten
+        for field in self.fields:
+            for aggregate in self._aggregates[field].values():
+                self._evict(aggregate, field, now - aggregate.seconds, seq)
+
+        self._times[slot] = now
+        self._next += 1
+        for field in self.fields:
+            values = self._values[field]
+            value = observation.values[FIELD_INDEX[field]]
+            values[slot] = math.nan if value is None else value
+            view = _RingView(values, self.capacity)
+            for aggregate in self._aggregates[field].values():
+                aggregate.add(seq, values[slot], view)
+
+    def _evict(self, aggregate, field, cutoff, seq):
+        """Evict samples older than cutoff or about to be overwritten."""
+        values = self._values[field]
+        while aggregate.start < seq and (
+            seq - aggregate.start >= self.capacity
+            or self._times[aggregate.start % self.capacity] < cutoff
+        ):
+            aggregate.evict(aggregate.start, values[aggregate.start % self.capacity])
+
+    def window(self, field, name):
+        """Return min/max/mean/sum/change of a field over a window."""
+        aggregate = self._aggregates[field][name]
+        if not aggregate.count:
+            return None
+        values = self._values[field]
+        first = values[aggregate.start % self.capacity]
+        last = values[(self._next - 1) % self.capacity]
+        change = None
+        if not math.isnan(first) and not math.isnan(last):
+            change = round(last - first, 2)
+        return {
+            "min": values[aggregate._min[0] % self.capacity],
+            "max": values[aggregate._max[0] % self.capacity],
+            "mean": round(aggregate.total / aggregate.count, 2),
+            "sum": round(aggregate.total, 2),
+            "change": change,
+        }
+
+    def change(self, field, name):
+        """Return the change of a field over a window, or None."""
+        stats = self.window(field, name)
+        return stats["change"] if stats else None
+
+    def attributes(self, field):
+        """Return the windowed statistics of a field as flat attributes."""
+        attributes = {}
+        for name in self.windows:
+            if (stats := self.window(field, name)) is None:
+                continue
+            for key in TREND_STATS:
+                attributes[f"{key}_{name}"] = stats[key]
+        return attributes
+
+
+class _RingView:
+    """Index a ring array by sequence number."""
+
+    __slots__ = ("_values", "_capacity")
+
+    def __init__(self, values, capacity):
+        """Initialize the view."""
+        self._values = values
+        self._capacity = capacity
+
+    def __getitem__(self, seq):
+        """Return the value stored for seq."""
+        return self._values[seq % self._capacity]
@@ -0,0 +1 @@
+"""Tests for the Wunderground Weather integration."""
@@ -0,0 +1,70 @@
+"""Tests for the API key cache and the observation fetch."""
+import asyncio
+
+import aiohttp
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from benchmarks.standin import StandInServer, dashboard_page, redirect
+from custom_components.wunderground_weather.api import ApiKeyCache, fetch_weather_data
+
+
+def _poll(polls, concurrent=False, prepare=None, **server_options):
+    """Poll a stand-in with one key cache; return the results and the counters."""
+
+    async def run():
+        async with StandInServer(dashboard_size=1024, **server_options) as server:
+            if prepare is not None:
+                prepare(server)
+            key_cache = ApiKeyCache()
+            with redirect(server.url):
+                async with aiohttp.ClientSession() as session:
+
+                    async def poll():
+                        try:
+                            return await fetch_weather_data(session, "KXX1", key_cache)
+                        except UpdateFailed as err:
+                            return err
+
+                    if concurrent:
+                        results = await asyncio.gather(*(poll() for _ in range(polls)))
+                    else:
+                        results = [await poll() for _ in range(polls)]
+            return results, server.stats, key_cache.stats
+
+    return asyncio.run(run())
+
+
+def test_cached_key_is_reused_across_polls():
+    results, requests, cache = _poll(5)
+    assert all(result["observations"] for result in results)
+    assert requests["dashboard"] == 1
+    assert requests["observations"] == 5
+    assert (cache["misses"], cache["hits"], cache["refreshes"]) == (1, 4, 1)
+
+
+def test_concurrent_misses_scrape_once():
+    results, requests, cache = _poll(5, concurrent=True)
+    assert all(result["observations"] for result in results)
+    assert requests["dashboard"] == 1
+    assert cache["refreshes"] == 1
+
+
+def test_rejected_key_is_scraped_again_once_and_retried():
+    # The third request is rejected with the rotated-out key
+    results, requests, cache = _poll(3, rotate_after=2)
+    assert all(result["observations"] for result in results)
+    assert requests["rejected_key"] == 1
+    assert requests["dashboard"] == 2
+    assert requests["observations"] == 4
+    assert cache["refreshes"] == 2
+
+
+def test_key_rejected_after_rescrape_fails_the_poll():
+    def serve_wrong_key(server):
+        server._pages = {server.api_key: dashboard_page("wrong" * 6, 1024).encode()}
+
+    results, requests, cache = _poll(1, prepare=serve_wrong_key)
+    assert isinstance(results[0], UpdateFailed)
+    # One re-scrape and one retry, no loop
+    assert requests["dashboard"] == 2
+    assert requests["rejected_key"] == 2
@@ -0,0 +1,62 @@
+"""Tests for the observation archive."""
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import datetime, timezone
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.wunderground_weather import archive
+from custom_components.wunderground_weather.archive_format import ArchiveReader
+from custom_components.wunderground_weather.const import SENSOR_TYPES
+from custom_components.wunderground_weather.observation import FIELD_INDEX, Observation
+
+PACKAGE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "custom_components", "wunderground_weather"
+)
+
+
+def _observation(epoch, temperature):
+    values = [None] * len(SENSOR_TYPES)
+    values[FIELD_INDEX["temperature"]] = temperature
+    return Observation(datetime.fromtimestamp(epoch, timezone.utc), None, tuple(values))
+
+
+def test_reader_runs_without_home_assistant(tmp_path):
+    script = textwrap.dedent(
+        f"""
+        import sys
+        sys.modules["homeassistant"] = None
+        sys.path.insert(0, {PACKAGE!r})
+        from archive_format import ArchiveReader, write_batches
+
+        rows = [(120, [1.5, None]), (60, [0.5, 2.0])]
+        assert write_batches({str(tmp_path)!r}, {{"KXX1": rows}}, ["a", "b"], "m", 1024) == {{}}
+        result = ArchiveReader({str(tmp_path)!r}).query("KXX1")
+        assert result["a"] == [0.5, 1.5] and result["b"] == [2.0, None], result
+        """
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_failed_station_is_retained(tmp_path):
+    # A file where the station directory should be makes its writes fail
+    (tmp_path / "KBAD1").write_text("")
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        store = archive.ObservationArchive(hass, root=str(tmp_path))
+        store.async_add("KGOOD1", _observation(60, 10.0))
+        store.async_add("KBAD1", _observation(60, 20.0))
+        store.async_add("KBAD1", _observation(120, 21.0))
+        await store.async_flush()
+        counters = store.as_dict()
+        await hass.async_stop(force=True)
+        return counters
+
+    counters = asyncio.run(run())
+    assert counters == {"buffered": 2, "archived": 1, "flushes": 1}
+    result = ArchiveReader(str(tmp_path)).query("KGOOD1")
+    assert result["temperature"] == [10.0]
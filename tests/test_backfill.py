@@ -0,0 +1,90 @@
+"""Tests for the history backfill."""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import voluptuous as vol
+
+from benchmarks.hass import async_start_hass, async_stop_hass
+from custom_components.wunderground_weather import BACKFILL_SCHEMA
+from custom_components.wunderground_weather.backfill import aggregate_history, statistics_rows
+from custom_components.wunderground_weather.hub import async_get_hub
+
+CALL = {"station_id": "KXX1", "start_date": "2024-06-01", "end_date": "2024-06-02"}
+
+
+def test_daily_resolution_is_rejected():
+    with pytest.raises(vol.Invalid):
+        BACKFILL_SCHEMA({**CALL, "resolution": "daily"})
+
+
+def test_hourly_resolution_is_the_default():
+    assert BACKFILL_SCHEMA(CALL)["resolution"] == "hourly"
+
+
+def _history(rows):
+    return {
+        "observations": [
+            {"obsTimeUtc": obs_time, "winddirAvg": 350, "metric": metric}
+            for obs_time, metric in rows
+        ]
+    }
+
+
+def test_only_sensors_with_statistics_are_reduced():
+    buckets = {}
+    aggregate_history(
+        _history([("2024-06-01T10:00:00Z", {"tempAvg": 20, "windspeedAvg": 5, "precipTotal": 1})]),
+        buckets,
+    )
+    assert {sensor_type for sensor_type, _ in buckets} == {"temperature", "precip_total"}
+
+
+def test_precip_total_is_imported_as_a_sum():
+    hour = datetime(2024, 6, 1, 22, tzinfo=timezone.utc)
+    history = _history(
+        [
+            ((hour + timedelta(hours=offset)).strftime("%Y-%m-%dT%H:%M:%SZ"), metric)
+            for offset, metric in enumerate(
+                [
+                    {"tempAvg": 20, "tempLow": 19, "tempHigh": 21, "precipTotal": 1.0},
+                    {"tempAvg": 18, "precipTotal": 2.5},
+                    # Reset at midnight
+                    {"tempAvg": 17, "precipTotal": 0.5},
+                ]
+            )
+        ]
+    )
+    statistic_ids = {"temperature": "sensor.temperature", "precip_total": "sensor.precip"}
+    buckets = {}
+    aggregate_history(history, buckets)
+    # Two batches, the sum carries over
+    first = {key: bucket for key, bucket in buckets.items() if key[1] < hour + timedelta(hours=2)}
+    last = {key: bucket for key, bucket in buckets.items() if key not in first}
+    sums = {}
+    imported = {}
+    for batch in (first, last):
+        for metadata, rows in statistics_rows(statistic_ids, batch, sums):
+            imported.setdefault(metadata["statistic_id"], (metadata, []))[1].extend(rows)
+
+    metadata, rows = imported["sensor.precip"]
+    assert (metadata["has_sum"], metadata["has_mean"]) == (True, False)
+    assert [(row["state"], row["sum"]) for row in rows] == [(1.0, 0.0), (2.5, 1.5), (0.5, 2.0)]
+    assert sums["precip_total"] == (0.5, 2.0)
+    metadata, rows = imported["sensor.temperature"]
+    assert (metadata["has_sum"], metadata["has_mean"]) == (False, True)
+    assert rows[0] == {"start": hour, "mean": 20.0, "min": 19.0, "max": 21.0}
+
+
+def test_job_without_sensors_is_dropped(tmp_path):
+    async def run():
+        hass = await async_start_hass(str(tmp_path))
+        try:
+            backfill = async_get_hub(hass).backfill
+            backfill.async_start("KXX1", date(2024, 6, 1), date(2024, 6, 2), "hourly")
+            await hass.async_block_till_done()
+            return backfill.stats
+        finally:
+            await async_stop_hass(hass)
+
+    assert asyncio.run(run()) == {"pending": 0, "running": 0}
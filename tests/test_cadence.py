@@ -0,0 +1,65 @@
+"""Tests for the adaptive polling cadence."""
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from custom_components.wunderground_weather import cadence
+from custom_components.wunderground_weather.cadence import StationCadence
+from custom_components.wunderground_weather.const import ADAPTIVE_UPLOAD_DELAY, SENSOR_TYPES
+from custom_components.wunderground_weather.observation import Observation
+
+START = datetime(2024, 6, 1, tzinfo=timezone.utc)
+FLOOR = 30
+CEILING = 3600
+
+
+def _observation(seconds):
+    return Observation(START + timedelta(seconds=seconds), None, (None,) * len(SENSOR_TYPES))
+
+
+def _delay(tracker, now):
+    with mock.patch.object(cadence.random, "uniform", return_value=0):
+        return tracker.next_delay(FLOOR, CEILING, now)
+
+
+def test_poll_aligns_to_learned_upload_period():
+    tracker = StationCadence()
+    for seconds in (0, 300, 600):
+        assert tracker.record(_observation(seconds))
+    assert tracker.period == 300
+    # Next upload at 900 s, polled shortly after it
+    now = START + timedelta(seconds=620)
+    assert _delay(tracker, now) == 900 - 620 + ADAPTIVE_UPLOAD_DELAY
+
+
+def test_polling_stretches_while_time_doesnt_advance_and_recovers():
+    tracker = StationCadence()
+    for seconds in (0, 300, 600):
+        tracker.record(_observation(seconds))
+    now = START + timedelta(seconds=620)
+
+    delays = []
+    for _ in range(5):
+        assert not tracker.record(_observation(600))
+        assert tracker.duplicate
+        delays.append(_delay(tracker, now))
+    assert delays == [FLOOR, 2 * FLOOR, 4 * FLOOR, 8 * FLOOR, 16 * FLOOR]
+    for _ in range(5):
+        tracker.record(_observation(600))
+    assert _delay(tracker, now) == CEILING
+    assert tracker.wasted_ratio == 10 / 13
+
+    # A new observation resets the backoff and the learned period is kept
+    assert tracker.record(_observation(900))
+    assert not tracker.duplicate and tracker.backoff == 0
+    assert tracker.period == 300
+    assert _delay(tracker, START + timedelta(seconds=905)) == 1200 - 905 + ADAPTIVE_UPLOAD_DELAY
+
+
+def test_failed_polls_back_off_without_learning():
+    tracker = StationCadence()
+    tracker.record(None)
+    tracker.record(None)
+    assert tracker.period is None and tracker.last_observation is None
+    assert _delay(tracker, START) == 2 * FLOOR
+    tracker.record(_observation(0))
+    assert _delay(tracker, START) == FLOOR
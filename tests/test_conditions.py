@@ -0,0 +1,181 @@
+"""Tests for the batch condition classifier."""
+import itertools
+import logging
+import random
+
+from custom_components.wunderground_weather.conditions import CONDITIONS, classify_observations
+from custom_components.wunderground_weather.observation import decode_observation
+from custom_components.wunderground_weather.weather import map_condition
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# Verbatim copy of the scalar rules the batch classifier replaced
+def baseline_map_condition(data):
+    """Map weather data to Home Assistant conditions."""
+    metric = data.get("metric", {})
+    temp = metric.get("temp", 0)
+    humidity = data.get("humidity", 0)
+    wind_speed = metric.get("windSpeed", 0)
+    precip_rate = metric.get("precipRate", 0)
+    solar_radiation = data.get("solarRadiation", 0)
+    uv_index = data.get("uv", 0)
+    obs_time = data.get("obsTimeLocal", "")
+
+    # Ensure all values are numbers
+    try:
+        temp = float(temp) if temp is not None else 0
+        humidity = float(humidity) if humidity is not None else 0
+        wind_speed = float(wind_speed) if wind_speed is not None else 0
+        precip_rate = float(precip_rate) if precip_rate is not None else 0
+        solar_radiation = float(solar_radiation) if solar_radiation is not None else 0
+        uv_index = float(uv_index) if uv_index is not None else 0
+    except (ValueError, TypeError):
+        _LOGGER.warning("Error converting weather values to numbers")
+        temp = 0
+        humidity = 0
+        wind_speed = 0
+        precip_rate = 0
+        solar_radiation = 0
+        uv_index = 0
+
+    # Safely determine if it's day or night
+    is_day = True  # Default to day
+    try:
+        if obs_time and " " in obs_time:
+            time_parts = obs_time.split(" ")
+            if len(time_parts) > 1:
+                time_str = time_parts[1]
+                if ":" in time_str:
+                    hour_str = time_str.split(":")[0]
+                    hour = int(hour_str)
+                    is_day = 6 <= hour <= 18
+    except (ValueError, IndexError):
+        _LOGGER.warning("Could not parse observation time: %s", obs_time)
+
+    if precip_rate > 0.0:
+        if temp <= 0:
+            return "snowy-rainy" if precip_rate > 0.1 else "snowy"
+        return "pouring" if precip_rate > 5.0 else "rainy"
+
+    if solar_radiation > 50 and is_day:
+        return "sunny" if humidity < 70 else "partlycloudy"
+
+    if humidity >= 95 and solar_radiation < 10:
+        return "fog"
+
+    if wind_speed > 20:
+        return "windy-variant" if solar_radiation < 50 else "windy"
+
+    if solar_radiation < 10 and not is_day:
+        return "clear-night"
+
+    if solar_radiation < 50:
+        return "cloudy"
+
+    return "exceptional"
+
+
+MISSING = object()
+# Payload keys, "metric." ones inside the metric section
+FIELDS = (
+    "metric.temp",
+    "humidity",
+    "metric.windSpeed",
+    "metric.precipRate",
+    "solarRadiation",
+    "uv",
+    "obsTimeLocal",
+)
+# Values on and just around every threshold of the rules
+BOUNDARIES = (
+    [-0.1, 0, 0.1],
+    [69.9, 70, 94.9, 95],
+    [20, 20.01],
+    [0, 0.05, 0.1, 0.1001, 5, 5.0001],
+    [9.99, 10, 50, 50.01],
+    [0, 3],
+    ["2024-06-01 05:59:00", "2024-06-01 06:00:00", "2024-06-01 18:59:00", "2024-06-01 19:00:00"],
+)
+# Missing, null and non-numeric values of every field
+SPECIALS = (MISSING, None, "n/a", "")
+TIME_SPECIALS = (MISSING, None, "", "2024-06-01", "2024-06-01 xx:00:00")
+
+
+def _payload(row):
+    data = {"metric": {}}
+    for field, value in zip(FIELDS, row):
+        if value is MISSING:
+            continue
+        if field.startswith("metric."):
+            data["metric"][field[len("metric."):]] = value
+        else:
+            data[field] = value
+    return data
+
+
+def _rows():
+    grid = list(itertools.product(*BOUNDARIES))
+    generator = random.Random(0)
+    rows = list(grid)
+    for index, field in enumerate(FIELDS):
+        specials = TIME_SPECIALS if field == "obsTimeLocal" else SPECIALS
+        for special in specials:
+            for row in generator.sample(grid, 200):
+                rows.append(row[:index] + (special,) + row[index + 1:])
+    # Several bad values at once
+    for row in generator.sample(grid, 500):
+        row = list(row)
+        for index in generator.sample(range(len(FIELDS)), 3):
+            row[index] = generator.choice(SPECIALS)
+        rows.append(tuple(row))
+    return rows
+
+
+def _assert_parity(payloads):
+    observations = [decode_observation({"observations": [data]}) for data in payloads]
+    actual = [CONDITIONS[code] for code in classify_observations(observations)]
+    for data, condition in zip(payloads, actual):
+        assert condition == baseline_map_condition(data), data
+
+
+def test_map_condition_matches_baseline_on_malformed_values():
+    # Any value that isn't a number zeroes all of them, uv included
+    rain = {"uv": "n/a", "metric": {"precipRate": 3, "temp": 15}}
+    assert map_condition(decode_observation(rain)) == baseline_map_condition(rain) == "cloudy"
+    sun = {"humidity": "n/a", "solarRadiation": 400, "metric": {"windSpeed": 30}}
+    assert map_condition(decode_observation(sun)) == baseline_map_condition(sun) == "cloudy"
+
+
+def test_boundaries_and_bad_values_match_baseline():
+    payloads = [_payload(row) for row in _rows()]
+    _assert_parity(payloads)
+    # The single-observation path used by the weather entity
+    for data in payloads[::97]:
+        assert map_condition(decode_observation(data)) == baseline_map_condition(data), data
+
+
+def test_random_rows_match_baseline():
+    generator = random.Random(1)
+
+    def value(low, high):
+        roll = generator.random()
+        if roll < 0.03:
+            return generator.choice(SPECIALS)
+        return round(generator.uniform(low, high), 1) if roll > 0.3 else round(low, 1)
+
+    payloads = [
+        _payload(
+            (
+                value(-20, 35),
+                value(10, 100),
+                value(0, 40),
+                value(0, 8),
+                value(0, 1000),
+                value(0, 11),
+                f"2024-06-01 {generator.randrange(24):02d}:00:00",
+            )
+        )
+        for _ in range(20000)
+    ]
+    _assert_parity(payloads)
@@ -0,0 +1,171 @@
+"""Tests for the station coordinator."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.wunderground_weather.const import (
+    DEFAULT_MAX_STALE_AGE,
+    SENSOR_TYPES,
+    UNITS_IMPERIAL,
+)
+from custom_components.wunderground_weather.coordinator import WundergroundCoordinator
+from custom_components.wunderground_weather.hub import WundergroundHub
+from custom_components.wunderground_weather.observation import Observation
+from custom_components.wunderground_weather.snapshot import SnapshotStore
+
+
+def _observation(minutes):
+    obs_time = datetime(2024, 6, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+    return Observation(obs_time, None, (1.0,) * len(SENSOR_TYPES))
+
+
+def test_backup_data_is_served_but_not_learned(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hub = WundergroundHub(hass)
+        coordinator = WundergroundCoordinator(hass, hub, "KPRI1")
+        stored = []
+        hub.async_store_observation = lambda station_id, data: stored.append(data)
+
+        coordinator.source_station = "KBAK1"
+        backup = _observation(0)
+        served = coordinator._accept(backup)
+        assert served is backup
+        assert coordinator.cadence.last_observation is None
+        assert stored == []
+
+        coordinator.source_station = "KPRI1"
+        primary = _observation(5)
+        assert coordinator._accept(primary) is primary
+        assert coordinator.cadence.last_observation == primary.obs_time
+        assert stored == [primary]
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_backup_fetches_are_timed_apart(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hub = WundergroundHub(hass)
+        coordinator = WundergroundCoordinator(hass, hub, "KPRI1")
+        payload = {"observations": [{"obsTimeUtc": "2024-06-01T00:00:00Z", "metric": {}}]}
+        calls = []
+
+        async def fetch(station_id, stats):
+            calls.append((station_id, stats))
+            stats.add_bytes(100)
+            return payload
+
+        hub.async_fetch = fetch
+        await coordinator._async_fetch_station("KBAK1")
+        assert calls == [("KBAK1", coordinator.backup_stats)]
+        assert coordinator.stats.bytes_received == 0
+        assert coordinator.stats.p95("primary") is None
+
+        await coordinator._async_fetch_station("KPRI1")
+        assert calls[-1] == ("KPRI1", coordinator.stats)
+        assert coordinator.stats.p95("primary") is not None
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_identical_observation_does_not_notify_listeners(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hub = WundergroundHub(hass)
+        hub.async_store_observation = lambda station_id, data: None
+        coordinator = WundergroundCoordinator(hass, hub, "KPRI1")
+        row = {"obsTimeUtc": "2024-06-01T00:00:00Z", "humidity": 50, "metric": {"temp": 20.0}}
+
+        async def fetch(station_id, stats):
+            return {"observations": [dict(row)]}
+
+        hub.async_fetch = fetch
+        notified = []
+        unsubscribe = coordinator.async_add_listener(lambda: notified.append(coordinator.data))
+
+        await coordinator.async_refresh()
+        first = coordinator.data
+        assert len(notified) == 1
+        # The station hasn't uploaded since: same obsTimeUtc
+        await coordinator.async_refresh()
+        assert len(notified) == 1
+        assert coordinator.data is first
+        assert coordinator.suppressed_updates == 1
+
+        row["obsTimeUtc"] = "2024-06-01T00:05:00Z"
+        await coordinator.async_refresh()
+        assert len(notified) == 2
+        unsubscribe()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_restored_snapshot_is_stale_until_max_age(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hub = WundergroundHub(hass)
+        hub.async_store_observation = lambda station_id, data: None
+        coordinator = WundergroundCoordinator(hass, hub, "KPRI1")
+        now = datetime.now(timezone.utc)
+
+        async def fail(station_id, stats):
+            raise UpdateFailed("Station offline")
+
+        hub.async_fetch = fail
+        snapshot = Observation(now - timedelta(minutes=10), None, (1.0,) * len(SENSOR_TYPES))
+        coordinator.restore(snapshot)
+        assert coordinator.stale
+
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.data is snapshot
+        assert coordinator.stale
+
+        # Past the max age the snapshot is dropped rather than served
+        expired = snapshot._replace(obs_time=now - timedelta(seconds=DEFAULT_MAX_STALE_AGE + 60))
+        coordinator.restore(expired)
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+
+        fresh = {"obsTimeUtc": now.strftime("%Y-%m-%dT%H:%M:%SZ"), "metric": {"temp": 20.0}}
+
+        async def fetch(station_id, stats):
+            return {"observations": [fresh]}
+
+        hub.async_fetch = fetch
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert not coordinator.stale
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_snapshot_round_trip(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        store = SnapshotStore(hass)
+        observation = _observation(0)
+        store.async_update("KPRI1", observation, SimpleNamespace(key="abc", fetched_at=1.0))
+        assert store.get_observation("KPRI1") == observation
+        assert store.get_observation("KOTH1") is None
+        assert store.api_key == ("abc", 1.0)
+
+        reloaded = SnapshotStore(hass)
+        await store._store.async_save(store._data_to_save())
+        await reloaded.async_load()
+        assert reloaded.get_observation("KPRI1") == observation
+        # Stored in other units than the integration now uses
+        imperial = SnapshotStore(hass, UNITS_IMPERIAL)
+        await imperial.async_load()
+        assert imperial.get_observation("KPRI1") is None
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,96 @@
+"""Tests for the forecast parsers."""
+from custom_components.wunderground_weather.forecast import (
+    parse_daily_forecast,
+    parse_hourly_forecast,
+)
+
+# 2024-06-01 and 2024-06-02 07:00 UTC
+DAYS = [1717225200, 1717311600]
+
+
+def test_daily_forecast_uses_night_part_once_day_part_is_gone():
+    payload = {
+        "validTimeUtc": DAYS,
+        # Evening: today's maximum and day part are no longer forecast
+        "temperatureMax": [None, 24],
+        "temperatureMin": [12, 13],
+        "qpf": [0.0, 2.5],
+        "daypart": [
+            {
+                "iconCode": [None, 29, 12, 47],
+                "temperature": [None, 15, 24, 14],
+                "precipChance": [None, 10, 80, 40],
+                "windSpeed": [None, 6, 18, 9],
+                "windDirection": [None, 200, 250, 270],
+                "relativeHumidity": [None, 70, 85, 90],
+            }
+        ],
+    }
+    today, tomorrow = parse_daily_forecast(payload)
+    assert today == {
+        "datetime": "2024-06-01T07:00:00+00:00",
+        "condition": "partlycloudy",
+        "native_temperature": 15,
+        "native_templow": 12,
+        "native_precipitation": 0.0,
+        "precipitation_probability": 10,
+        "native_wind_speed": 6,
+        "wind_bearing": 200,
+        "humidity": 70,
+    }
+    assert tomorrow["condition"] == "rainy"
+    assert tomorrow["native_temperature"] == 24
+    assert tomorrow["precipitation_probability"] == 80
+    assert tomorrow["humidity"] == 85
+
+
+def test_daily_forecast_tolerates_missing_sections():
+    assert parse_daily_forecast({}) == []
+    assert parse_daily_forecast({"validTimeUtc": None, "daypart": None}) == []
+    (forecast,) = parse_daily_forecast(
+        {"validTimeUtc": DAYS[:1], "temperatureMax": [], "daypart": [None]}
+    )
+    assert forecast["datetime"] == "2024-06-01T07:00:00+00:00"
+    assert forecast["condition"] is None
+    assert forecast["native_temperature"] is None
+    assert forecast["humidity"] is None
+
+
+def test_hourly_forecast():
+    payload = {
+        "validTimeUtc": [1717225200, 1717228800, 1717232400],
+        "iconCode": [32, 31, 44],
+        "temperature": [18, 17],
+        "qpf": [0.0, 0.0, 0.3],
+        "precipChance": [0, 5, 60],
+        "windSpeed": [5, 4, 7],
+        "windDirection": [90, 100, 110],
+        "relativeHumidity": [60, 65, 80],
+        "pressureMeanSeaLevel": [1015.2, 1015.0, 1014.1],
+        "dayOrNight": ["D", "N", None],
+    }
+    first, second, third = parse_hourly_forecast(payload)
+    assert first == {
+        "datetime": "2024-06-01T07:00:00+00:00",
+        "condition": "sunny",
+        "native_temperature": 18,
+        "native_precipitation": 0.0,
+        "precipitation_probability": 0,
+        "native_wind_speed": 5,
+        "wind_bearing": 90,
+        "humidity": 60,
+        "native_pressure": 1015.2,
+        "is_daytime": True,
+    }
+    assert second["condition"] == "clear-night"
+    assert not second["is_daytime"]
+    # Icon 44 is "not available"; the temperature list is short
+    assert third["condition"] is None
+    assert third["native_temperature"] is None
+    assert third["native_precipitation"] == 0.3
+
+
+def test_unknown_icon_codes_have_no_condition():
+    payload = {"validTimeUtc": DAYS, "iconCode": [-1, 99]}
+    assert [forecast["condition"] for forecast in parse_hourly_forecast(payload)] == [None, None]
+    assert parse_hourly_forecast({"validTimeUtc": None}) == []
@@ -0,0 +1,151 @@
+"""Tests for the request budget and circuit breakers."""
+import asyncio
+from unittest import mock
+
+import aiohttp
+import pytest
+
+from custom_components.wunderground_weather import guard
+from custom_components.wunderground_weather.const import (
+    BREAKER_THRESHOLD,
+    FORECAST_URLS,
+    OBSERVATIONS_URL,
+)
+
+
+class _Response:
+    """Response context of the stub session."""
+
+    def __init__(self, status):
+        self.status = status
+
+    async def __aenter__(self):
+        if self.status >= 500:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _Session:
+    """Session answering every request with a fixed status."""
+
+    closed = False
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return _Response(self.status)
+
+
+async def _request(session, url):
+    async with session.get(url):
+        pass
+
+
+def _open(guarded, url):
+    """Trip the breaker of url and let its cool-down pass."""
+    breaker = guarded.breaker(guard.breaker_key(url))
+    breaker.failures = BREAKER_THRESHOLD
+    breaker.opened_until = 0.0
+    assert breaker.state == "half_open"
+    return breaker
+
+
+def test_budget_failure_releases_trial():
+    """A trial request that never got a budget token doesn't wedge the breaker."""
+
+    async def run():
+        stub = _Session()
+        guarded = guard.GuardedSession(lambda: stub, per_minute=1)
+        breaker = _open(guarded, OBSERVATIONS_URL)
+        guarded.budget._tokens = 0
+        with pytest.raises(guard.BudgetExceededError):
+            await _request(guarded, OBSERVATIONS_URL)
+
+        guarded.budget._tokens = 1
+        await _request(guarded, OBSERVATIONS_URL)
+        assert breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_cancelled_wait_releases_trial():
+    """A trial request cancelled while waiting for the budget doesn't wedge the breaker."""
+
+    async def run():
+        stub = _Session()
+        guarded = guard.GuardedSession(lambda: stub, per_minute=60)
+        breaker = _open(guarded, OBSERVATIONS_URL)
+        guarded.budget._tokens = 0
+        task = asyncio.ensure_future(_request(guarded, OBSERVATIONS_URL))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        guarded.budget._tokens = 1
+        await _request(guarded, OBSERVATIONS_URL)
+        assert breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_forecast_failures_dont_stop_observations():
+    """Forecast and observation endpoints on the same host have separate breakers."""
+
+    async def run():
+        stub = _Session(status=503)
+        guarded = guard.GuardedSession(lambda: stub)
+        for _ in range(BREAKER_THRESHOLD):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await _request(guarded, FORECAST_URLS["daily"])
+        with pytest.raises(guard.CircuitOpenError):
+            await _request(guarded, FORECAST_URLS["hourly"])
+
+        stub.status = 200
+        await _request(guarded, OBSERVATIONS_URL)
+        assert set(guarded.as_dict()["breakers"]) == {
+            "api.weather.com/v3/wx/forecast",
+            "api.weather.com/v2/pws/observations",
+        }
+
+    asyncio.run(run())
+
+
+def test_wait_for_leaves_the_reserve():
+    """Waiting for a reserve doesn't take tokens and returns once it's there."""
+
+    async def run():
+        bucket = guard.TokenBucket(6000)
+        bucket._tokens = 0
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await bucket.async_wait_for(5)
+        assert loop.time() - start >= 0.04
+        assert bucket._tokens >= 5
+        assert bucket.acquired == 0
+
+    asyncio.run(run())
+
+
+def test_queued_callers_are_rejected_past_the_max_wait():
+    """Time spent queued behind other callers counts against MAX_BUDGET_WAIT."""
+
+    async def run():
+        bucket = guard.TokenBucket(6000)
+        bucket._tokens = 0
+        # 100 tokens a second, so the 21st queued caller would wait 0.21 s
+        with mock.patch.object(guard, "MAX_BUDGET_WAIT", 0.2):
+            results = await asyncio.gather(
+                *(bucket.async_acquire() for _ in range(30)), return_exceptions=True
+            )
+        rejected = [result for result in results if isinstance(result, guard.BudgetExceededError)]
+        assert len(rejected) == 10
+        assert bucket.acquired == 20 and bucket.rejected == 10
+
+    asyncio.run(run())
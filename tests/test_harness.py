@@ -0,0 +1,59 @@
+"""Smoke tests of the offline benchmark harness."""
+import asyncio
+import os
+
+from benchmarks.bench_poll import async_run
+from benchmarks.bench_setup import import_times
+from benchmarks.soak import Soak, sustained_growth
+from benchmarks.standin import StandInServer, redirect
+
+
+def _run(mode, **server_options):
+    async def run():
+        async with StandInServer(**server_options) as server:
+            with redirect(server.url):
+                return await async_run(3, 2, mode, server.url, concurrency=2)
+
+    return asyncio.run(run())
+
+
+def test_fetch_mode_rotates_the_key():
+    result = _run("fetch", rotate_after=4)
+    assert result["polls"] == 6
+    assert result["requests"]["rejected_key"] >= 1
+    # Initial scrape plus one after the rotation
+    assert result["requests"]["dashboard"] == 2
+
+
+def test_hub_mode_polls_every_station():
+    result = _run("hub", dashboard_size=64 * 1024)
+    assert result["polls"] == 6
+    assert result["requests"]["observations"] == 6
+    assert result["latency_p95_ms"] > 0
+
+
+def test_load_defers_heavy_dependencies():
+    result = import_times()
+    assert result["deferred_imported"] == []
+    assert result["heaviest"][0]["module"] == "custom_components.wunderground_weather"
+
+
+def test_sustained_growth():
+    flat = [100, 90, 110, 100, 95, 105, 100, 100, 98, 102, 100, 100]
+    assert sustained_growth(flat, 0.25, lambda first: 0) is None
+    leak = list(range(0, 1200, 100))
+    # Samples 300...1100 after the warm-up: 900 (last third) - 500 (first third)
+    assert sustained_growth(leak, 0.25, lambda first: 0) == 400
+    assert sustained_growth(leak, 0.25, lambda first: 1000) is None
+
+
+def test_soak_samples_the_run(tmp_path):
+    soak = Soak(stations=2, hours=1, sample_minutes=10, archive=True)
+    report = asyncio.run(soak.async_run(str(tmp_path)))
+    assert len(report["samples"]) == 7
+    assert report["requests"]["observations"] >= 2 * 60
+    assert report["samples"][-1]["states"] > 0
+    assert all(
+        os.sep + "wunderground_weather" + os.sep in site["site"]
+        for site in report["allocation_sites"]
+    )
@@ -0,0 +1,41 @@
+"""Tests for the decoded observation."""
+import json
+
+from benchmarks.bench_decode import READS, update_decoded, update_raw
+from benchmarks.standin import load_fixture
+from custom_components.wunderground_weather.const import UNITS_IMPERIAL
+from custom_components.wunderground_weather.observation import FIELD_INDEX, decode_observation
+
+
+def test_decoded_values_match_raw_reads():
+    payload = json.loads(load_fixture("observations.json"))
+    metric = payload["observations"][0]["metric"]
+    metric["windGust"] = None
+    metric["dewpt"] = "n/a"
+    metric["pressure"] = "1013.2"
+    body = json.dumps(payload).encode()
+    assert update_decoded(body)[1] == update_raw(body)[1]
+    assert update_decoded(body)[1][READS.index("wind_gust")] is None
+
+
+def test_malformed_payloads_decode_to_none():
+    for payload in (None, {}, [], {"observations": []}, {"observations": [None]}):
+        assert decode_observation(payload) is None
+
+
+def test_imperial_units_decode_imperial_section():
+    payload = json.loads(load_fixture("observations.json"))
+    values = decode_observation(payload, UNITS_IMPERIAL).values
+    assert values[FIELD_INDEX["temperature"]] == 64.2
+    assert values[FIELD_INDEX["pressure"]] == 30.02
+    assert values[FIELD_INDEX["wind_speed"]] == 3.4
+    assert values[FIELD_INDEX["dew_point"]] == 55.0
+    # Unit-less values are outside the units section
+    assert values[FIELD_INDEX["humidity"]] == 72.0
+    assert values[FIELD_INDEX["wind_bearing"]] == 230
+
+    # Without an imperial section there is nothing in these units
+    del payload["observations"][0]["imperial"]
+    values = decode_observation(payload, UNITS_IMPERIAL).values
+    assert values[FIELD_INDEX["temperature"]] is None
+    assert values[FIELD_INDEX["humidity"]] == 72.0
@@ -0,0 +1,130 @@
+"""Tests for the local upload protocol."""
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.hass import async_add_station, async_start_hass, async_stop_hass
+from benchmarks.standin import StandInServer, redirect
+from custom_components.wunderground_weather import push
+from custom_components.wunderground_weather.const import (
+    CONF_PUSH_ENABLED,
+    CONF_PUSH_PASSWORD,
+    SENSOR_TYPES,
+    UNITS_IMPERIAL,
+)
+from custom_components.wunderground_weather.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.wunderground_weather.push import _authorized
+
+OPTIONS = {CONF_PUSH_ENABLED: True, CONF_PUSH_PASSWORD: "secret"}
+
+
+def test_upload_with_station_key_is_accepted():
+    assert _authorized(OPTIONS, {"ID": "KXX1", "PASSWORD": "secret"})
+
+
+def test_upload_without_station_key_is_rejected():
+    assert not _authorized(OPTIONS, {"ID": "KXX1"})
+    assert not _authorized(OPTIONS, {"ID": "KXX1", "PASSWORD": "wrong"})
+
+
+def test_upload_is_rejected_without_configured_key():
+    assert not _authorized({CONF_PUSH_ENABLED: True}, {"ID": "KXX1", "PASSWORD": ""})
+    assert not _authorized({CONF_PUSH_PASSWORD: "secret"}, {"PASSWORD": "secret"})
+
+
+def test_forward_error_does_not_log_station_key(caplog):
+    async def rejected(request):
+        return web.Response(status=401, text="Unauthorized")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/weatherstation/updateweatherstation.php", rejected)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        try:
+            async with aiohttp.ClientSession() as session:
+                hub = SimpleNamespace(session=session)
+                with mock.patch.object(
+                    push, "PUSH_FORWARD_URL", url + "/weatherstation/updateweatherstation.php"
+                ):
+                    await push.WundergroundPushView(None)._async_forward(
+                        hub, {"ID": "KXX1", "PASSWORD": "secret"}
+                    )
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+    assert "HTTP 401" in caplog.text
+    assert "secret" not in caplog.text
+
+
+def test_diagnostics_redact_station_key(tmp_path):
+    async def run():
+        async with StandInServer(dashboard_size=1024) as server:
+            with redirect(server.url):
+                hass = await async_start_hass(str(tmp_path))
+                try:
+                    coordinator = await async_add_station(hass, "KXX1", OPTIONS)
+                    return await async_get_config_entry_diagnostics(
+                        hass, coordinator.config_entry
+                    )
+                finally:
+                    await async_stop_hass(hass)
+
+    result = asyncio.run(run())
+    assert result["options"][CONF_PUSH_PASSWORD] == "**REDACTED**"
+    assert result["options"][CONF_PUSH_ENABLED] is True
+
+
+UPLOAD = {
+    "ID": "KPRI1",
+    "dateutc": "2024-06-01 12:00:00",
+    "tempf": "64.2",
+    "humidity": "72",
+    "baromin": "30.02",
+    "windspeedmph": "10",
+    "windgustmph": "-9999",
+    "winddir": "230",
+    "dewptf": "32",
+    "rainin": "0.1",
+    "dailyrainin": "1.5",
+    "UV": "3",
+}
+
+
+def test_upload_is_converted_to_metric():
+    observation = push.decode_upload(UPLOAD)
+    values = dict(zip(SENSOR_TYPES, observation.values))
+    assert observation.obs_time == datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+    assert values["temperature"] == 17.89
+    assert values["dew_point"] == 0.0
+    assert values["pressure"] == 1016.59
+    assert values["wind_speed"] == 16.09
+    assert values["precip_rate"] == 2.54
+    assert values["precip_total"] == 38.1
+    # Unit-less values are kept, missing sensors dropped
+    assert values["humidity"] == 72.0
+    assert values["wind_bearing"] == 230.0
+    assert values["uv"] == 3.0
+    assert values["wind_gust"] is None
+    assert values["solar_radiation"] is None
+
+
+def test_upload_keeps_imperial_units():
+    previous = SimpleNamespace(latitude=42.35, longitude=-71.08)
+    observation = push.decode_upload(UPLOAD, previous, UNITS_IMPERIAL, {"temperature", "pressure"})
+    values = dict(zip(SENSOR_TYPES, observation.values))
+    assert values["temperature"] == 64.2
+    assert values["pressure"] == 30.02
+    # Not decoded
+    assert values["wind_speed"] is None
+    assert (observation.latitude, observation.longitude) == (42.35, -71.08)
@@ -0,0 +1,100 @@
+"""Tests for the dashboard API key extraction."""
+import asyncio
+import gzip
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from benchmarks.standin import dashboard_page
+from custom_components.wunderground_weather import scraper
+
+API_KEY = "0123456789abcdef0123456789abcdef"
+PAGE = (
+    '<html><body><script id="app-root-state" type="application/json">'
+    f'{{&q;process.env&q;:{{&q;SUN_API_KEY&q;:&q;{API_KEY}&q;}}'
+    + "".join(f",&q;module{index}&q;:&q;{'x' * 64}&q;" for index in range(8000))
+    + "}</script></body></html>"
+).encode()
+
+
+def test_connection_is_reusable_after_early_exit(monkeypatch):
+    async def dashboard(request):
+        return web.Response(
+            body=gzip.compress(PAGE),
+            content_type="text/html",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    async def ping(request):
+        return web.Response(text="pong")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/dashboard/{station_id}", dashboard)
+        app.router.add_get("/ping", ping)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        monkeypatch.setattr(scraper, "DASHBOARD_URL", url + "/dashboard/{station_id}")
+        try:
+            async with aiohttp.ClientSession() as session:
+                assert await scraper.scrape_api_key(session, "KXX1") == API_KEY
+                # Same pooled connection as the dashboard request
+                async with session.get(url + "/ping") as response:
+                    return await response.text()
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(asyncio.wait_for(run(), 10)) == "pong"
+
+
+def _scan(page, size, first=None):
+    """Feed page in chunks of size (the first one of first bytes) to a scanner."""
+    scanner = scraper.ApiKeyScanner()
+    offsets = [0] + ([first] if first is not None else [])
+    offsets += range(offsets[-1] + size, len(page), size)
+    for start, end in zip(offsets, offsets[1:] + [len(page)]):
+        if (api_key := scanner.feed(page[start:end])) is not None:
+            return api_key
+    return None
+
+
+def test_scanner_finds_key_at_every_split():
+    page = dashboard_page(API_KEY, size=0, state_size=0).encode()
+    for split in range(1, len(page)):
+        assert _scan(page, len(page), split) == API_KEY, split
+    for size in range(1, 80):
+        assert _scan(page, size) == API_KEY, size
+
+
+def test_scanner_finds_key_in_padded_page():
+    page = dashboard_page(API_KEY, size=256 * 1024, state_size=64 * 1024).encode()
+    start = page.index(scraper.APP_STATE_MARKER) - 8
+    end = page.index(API_KEY.encode()) + len(API_KEY) + 8
+    # Chunk borders on every byte from the marker to past the key
+    for size in (scraper.SCRAPE_CHUNK_SIZE, 4096, 1000):
+        for first in range(start, end):
+            assert _scan(page, size, first) == API_KEY, (size, first)
+
+
+def test_scanner_rejects_state_without_key():
+    page = (
+        dashboard_page(API_KEY, size=0, state_size=0)
+        .replace("SUN_API_KEY", "OTHER_KEY")
+        .encode()
+    )
+    for split in range(1, len(page)):
+        with pytest.raises(ValueError):
+            _scan(page, len(page), split)
+
+
+def test_scanner_ignores_key_outside_state():
+    page = dashboard_page(API_KEY, size=0, state_size=0).replace(
+        "<wu-root></wu-root>", "<wu-root>&q;SUN_API_KEY&q;:&q;wrong&q;</wu-root>"
+    )
+    assert _scan(page.encode(), 64) == API_KEY
+    page = page.replace('id="app-root-state"', 'id="other-state"').encode()
+    assert _scan(page, 64) is None
@@ -0,0 +1,26 @@
+"""Tests for the observation sensors."""
+import asyncio
+
+from benchmarks.hass import async_add_station, async_start_hass, async_stop_hass
+from benchmarks.standin import StandInServer, redirect
+from custom_components.wunderground_weather.trends import TREND_ATTRIBUTES
+
+
+def test_changing_attributes_are_not_recorded(tmp_path):
+    async def run():
+        async with StandInServer(dashboard_size=1024) as server:
+            with redirect(server.url):
+                hass = await async_start_hass(str(tmp_path))
+                try:
+                    coordinator = await async_add_station(hass, "KXX1")
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    return hass.states.get("sensor.temperature_station_kxx1")
+                finally:
+                    await async_stop_hass(hass)
+
+    state = asyncio.run(run())
+    assert "writes_avoided" in state.attributes
+    unrecorded = state.state_info["unrecorded_attributes"]
+    assert {"writes_avoided"} | TREND_ATTRIBUTES <= unrecorded
+    assert "stale" not in unrecorded and "source_station" not in unrecorded
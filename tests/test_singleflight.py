@@ -0,0 +1,93 @@
+"""Tests for the single-flight request group."""
+import asyncio
+
+import pytest
+
+from custom_components.wunderground_weather.singleflight import SingleFlight
+
+
+def _fetcher(result=None, error=None):
+    """Return a factory that blocks until released, and its call log."""
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch():
+        calls.append(None)
+        await release.wait()
+        if error is not None:
+            raise error
+        return result
+
+    return fetch, calls, release
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flight = SingleFlight()
+        fetch, calls, release = _fetcher(result={"temp": 20})
+        waiters = [asyncio.ensure_future(flight.async_do("KPRI1", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.stats == {"issued": 1, "coalesced": 4, "in_flight": 1}
+        release.set()
+        results = await asyncio.gather(*waiters)
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats["in_flight"] == 0
+
+        # Other keys and later calls aren't joined
+        other, other_calls, other_release = _fetcher(result=1)
+        other_release.set()
+        await flight.async_do("KOTH1", other)
+        await flight.async_do("KOTH1", other)
+        assert len(other_calls) == 2
+
+    asyncio.run(run())
+
+
+def test_exception_reaches_every_waiter():
+    async def run():
+        flight = SingleFlight()
+        fetch, calls, release = _fetcher(error=ValueError("bad payload"))
+        waiters = [asyncio.ensure_future(flight.async_do("KPRI1", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.stats["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def run():
+        flight = SingleFlight()
+        fetch, calls, release = _fetcher(result="ok")
+        first = asyncio.ensure_future(flight.async_do("KPRI1", fetch))
+        second = asyncio.ensure_future(flight.async_do("KPRI1", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        release.set()
+        assert await second == "ok"
+        assert len(calls) == 1
+
+    asyncio.run(run())
+
+
+def test_call_is_cancelled_once_every_waiter_gives_up():
+    async def run():
+        flight = SingleFlight()
+        fetch, _, _ = _fetcher()
+        waiters = [asyncio.ensure_future(flight.async_do("KPRI1", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        (task,) = flight._calls.values()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        assert flight.stats["in_flight"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+"""Tests for the rolling-window trends."""
+import math
+import random
+from datetime import datetime, timezone
+
+from custom_components.wunderground_weather.const import SENSOR_TYPES
+from custom_components.wunderground_weather.observation import FIELD_INDEX, Observation
+from custom_components.wunderground_weather.trends import StationTrends
+
+WINDOWS = {"short": 30, "long": 200}
+
+
+def _observation(epoch, temperature):
+    values = [None] * len(SENSOR_TYPES)
+    values[FIELD_INDEX["temperature"]] = temperature
+    return Observation(datetime.fromtimestamp(epoch, timezone.utc), None, tuple(values))
+
+
+def _brute_force(samples, capacity, seconds):
+    """Return the window statistics computed from scratch, or None if empty."""
+    now = samples[-1][0]
+    window = [value for epoch, value in samples[-capacity:] if epoch >= now - seconds]
+    known = [value for value in window if value is not None]
+    if not known:
+        return None
+    first, last = window[0], window[-1]
+    return {
+        "min": min(known),
+        "max": max(known),
+        "mean": sum(known) / len(known),
+        "change": None if first is None or last is None else round(last - first, 2),
+    }
+
+
+def test_windows_match_brute_force():
+    for seed in range(20):
+        generator = random.Random(seed)
+        capacity = generator.choice([1, 2, 5, 16])
+        trends = StationTrends(capacity, WINDOWS, ("temperature",))
+        samples = []
+        epoch = 1_700_000_000
+        for _ in range(300):
+            # Repeated times, gaps longer than every window and missing values
+            epoch += generator.choice([0, 1, 5, 10, 40, 250])
+            value = None if generator.random() < 0.2 else round(generator.uniform(-5, 5), 1)
+            samples.append((epoch, value))
+            trends.add(_observation(epoch, value))
+            for name, seconds in WINDOWS.items():
+                expected = _brute_force(samples, capacity, seconds)
+                actual = trends.window("temperature", name)
+                if expected is None:
+                    assert actual is None, (seed, samples[-3:])
+                    continue
+                assert actual["min"] == expected["min"], seed
+                assert actual["max"] == expected["max"], seed
+                assert math.isclose(actual["mean"], expected["mean"], abs_tol=0.006), seed
+                assert actual["change"] == expected["change"], seed
+
+
+def test_empty_trends_have_no_attributes():
+    trends = StationTrends(4, WINDOWS, ("temperature",))
+    assert trends.window("temperature", "short") is None
+    assert trends.attributes("temperature") == {}
+    trends.add(_observation(1_700_000_000, None))
+    assert trends.change("temperature", "long") is None